@@ -0,0 +1,29 @@
+import sys
+
+from aqi_monthly import PARTIALS_TABLE, append_daily
+from table_store import read_table, write_table
+
+# Fold a newly published daily AQI file into the stored county-month
+# partials instead of re-running ny_county_aqi.py / ny_aqi_processing.py
+# over the whole 1980–present history.
+#   python aqi_append.py aqi_daily_2022_New_York.csv
+if len(sys.argv) != 2:
+    sys.exit("usage: python aqi_append.py <new daily AQI csv>")
+new_daily_csv = sys.argv[1]
+
+partials = read_table(PARTIALS_TABLE)
+aggregator, months = append_daily(new_daily_csv, partials, state="New York")
+
+if months.empty:
+    sys.exit("No new daily rows (all dates already folded in)")
+print(f"Updated {len(months)} months: {months[0]:%Y-%m} .. {months[-1]:%Y-%m}")
+
+# Re-derive the monthly means from the updated partials
+monthly_county = aggregator.county_monthly()
+monthly_statewide = aggregator.statewide_monthly("NY_AQI", start="2010-01-01")
+
+write_table(aggregator.partials(), PARTIALS_TABLE)
+write_table(monthly_county, "ny_monthly_county_aqi")
+write_table(monthly_statewide, "monthly_statewide")
+
+print(monthly_statewide.tail(12))
@@ -0,0 +1,308 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import span, traced
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+DAILY_AQI_CSV = "aqi_daily_1980_to_2021_New_York.csv"
+CHUNKSIZE = 500_000
+
+STATE_COL = "State Name"
+COUNTY_COL = "County Name"
+DATE_COL = "Date"
+AQI_COL = "AQI"
+
+# Mergeable county-month partials written by ny_county_aqi.py
+PARTIALS_TABLE = "ny_county_aqi_partials"
+
+# All-states outputs written by aqi_states.py, partitioned by STATEFP
+COUNTY_DATASET = "monthly_county_aqi"
+PARTIALS_DATASET = "county_aqi_partials"
+STATE_TABLE = "monthly_state_aqi"
+
+
+# -------------------------------------------------------------------
+# STREAMING READER
+# -------------------------------------------------------------------
+def resolve_columns(path, wanted):
+    """
+    Map each wanted column to the file's own spelling of it, matching
+    headers case- and whitespace-insensitively (the EPA annual
+    daily_aqi_by_county files say "county Name", the NY extract "County Name").
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    by_key = {col.strip().lower(): col for col in header}
+    missing = [col for col in wanted if col.lower() not in by_key]
+    if missing:
+        raise ValueError(f"{path} has no {', '.join(missing)} column (header: {', '.join(header)})")
+    return {col: by_key[col.lower()] for col in wanted}
+
+
+def read_aqi_chunks(path=DAILY_AQI_CSV, state=None, start=None, end=None, chunksize=CHUNKSIZE,
+                    keep_state=False):
+    """
+    Yield the daily AQI file chunk by chunk, keeping only County Name,
+    Date and AQI with compact dtypes (categorical county, int16 AQI).
+
+    The state / date filters are applied to every chunk as it is read,
+    so rows outside the window never accumulate in memory. `state` is one
+    State Name or a list of them; keep_state=True keeps the State Name
+    column (categorical) for splitting a multi-state file. Headers are
+    matched case-insensitively and renamed to the *_COL spellings.
+    """
+    dtype = {COUNTY_COL: "category", DATE_COL: None, AQI_COL: "int16"}
+    if state is not None or keep_state:
+        dtype[STATE_COL] = "category"
+    columns = resolve_columns(path, list(dtype))
+    states = [state] if isinstance(state, str) else state
+
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+
+    reader = pd.read_csv(
+        path,
+        usecols=list(columns.values()),
+        dtype={columns[col]: kind for col, kind in dtype.items() if kind is not None},
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        chunk = chunk.rename(columns={actual: col for col, actual in columns.items()})
+        if states is not None:
+            chunk = chunk[chunk[STATE_COL].isin(states)]
+        if not keep_state and STATE_COL in chunk.columns:
+            chunk = chunk.drop(columns=STATE_COL)
+        if chunk.empty:
+            continue
+
+        chunk[DATE_COL] = pd.to_datetime(chunk[DATE_COL], format="%Y-%m-%d")
+        if start is not None:
+            chunk = chunk[chunk[DATE_COL] >= start]
+        if end is not None:
+            chunk = chunk[chunk[DATE_COL] <= end]
+        if not chunk.empty:
+            yield chunk
+
+
+# -------------------------------------------------------------------
+# KERNEL
+# -------------------------------------------------------------------
+def month_codes(dates):
+    """Integer month index (months since 1970-01) for a datetime column."""
+    return dates.to_numpy().astype("datetime64[M]").astype(np.int64)
+
+
+def bincount_2d(rows, cols, values, shape):
+    """Per-cell sum of values on a dense rows x cols grid (cells may repeat)."""
+    flat = rows * shape[1] + cols
+    return np.bincount(flat, weights=values, minlength=shape[0] * shape[1]).reshape(shape)
+
+
+# -------------------------------------------------------------------
+# RUNNING MONTHLY AGGREGATOR
+# -------------------------------------------------------------------
+class MonthlyAQIAggregator:
+    """
+    Folds daily chunks into dense county x month AQI partials:
+    sum, count, min, max and the last day folded in.
+
+    Each chunk is reduced with one bincount over (county code, month code),
+    so memory is bounded by counties x months rather than by the daily row
+    count. The partials are mergeable: county and statewide means are
+    derived from them without rescanning daily data, and a stored set can
+    be reloaded (from_partials) and extended with newly published days.
+    All dates are month-start.
+    """
+
+    # array name -> fill value for cells that have not seen any data
+    _FILL = {
+        "sums": 0.0,
+        "counts": 0,
+        "mins": np.inf,
+        "maxs": -np.inf,
+        "last_days": np.iinfo(np.int64).min,
+    }
+
+    def __init__(self):
+        self.counties = []
+        self._county_index = {}
+        self.first_month = None
+        self.sums = np.zeros((0, 0))
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+        self.mins = np.zeros((0, 0))
+        self.maxs = np.zeros((0, 0))
+        self.last_days = np.zeros((0, 0), dtype=np.int64)
+
+    def _county_codes(self, county):
+        # a filtered chunk still carries every county of the file as a category
+        county = county.astype("category").cat.remove_unused_categories()
+        lookup = np.array(
+            [self._county_index.setdefault(name, len(self._county_index)) for name in county.cat.categories],
+            dtype=np.int64,
+        )
+        self.counties = list(self._county_index)
+        return lookup[county.cat.codes.to_numpy()]
+
+    def _grow(self, first_month, last_month):
+        n_counties = len(self.counties)
+        if self.first_month is None:
+            self.first_month = first_month
+        pad_before = max(self.first_month - first_month, 0)
+        pad_after = max(last_month - (self.first_month + self.sums.shape[1] - 1), 0)
+        pad_rows = n_counties - self.sums.shape[0]
+        if pad_before or pad_after or pad_rows:
+            pad = ((0, pad_rows), (pad_before, pad_after))
+            for name, fill in self._FILL.items():
+                setattr(self, name, np.pad(getattr(self, name), pad, constant_values=fill))
+            self.first_month -= pad_before
+
+    def _fold(self, rows, cols, sums, counts, mins, maxs, last_days):
+        """Merge per-row partials into the dense grid (cells may repeat)."""
+        self.sums += bincount_2d(rows, cols, sums, self.sums.shape)
+        self.counts += bincount_2d(rows, cols, counts, self.counts.shape).astype(np.int64)
+        np.minimum.at(self.mins, (rows, cols), mins)
+        np.maximum.at(self.maxs, (rows, cols), maxs)
+        np.maximum.at(self.last_days, (rows, cols), last_days)
+
+    @traced("aqi_fold_chunk")
+    def update(self, chunk):
+        """Fold one chunk of daily rows (County Name, Date, AQI)."""
+        rows = self._county_codes(chunk[COUNTY_COL])
+        months = month_codes(chunk[DATE_COL])
+        self._grow(months.min(), months.max())
+
+        aqi = chunk[AQI_COL].to_numpy(dtype=np.float64)
+        days = chunk[DATE_COL].to_numpy().astype("datetime64[D]").astype(np.int64)
+        self._fold(rows, months - self.first_month, aqi, np.ones(len(aqi)), aqi, aqi, days)
+        return self
+
+    def consume(self, chunks):
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def merge_partials(self, partials):
+        """Fold a partials() table (e.g. one loaded from the store) into this one."""
+        rows = self._county_codes(partials["County"].astype(str))
+        months = month_codes(partials["date"])
+        self._grow(months.min(), months.max())
+        self._fold(
+            rows,
+            months - self.first_month,
+            partials["AQI_sum"].to_numpy(dtype=np.float64),
+            partials["AQI_count"].to_numpy(dtype=np.float64),
+            partials["AQI_min"].to_numpy(dtype=np.float64),
+            partials["AQI_max"].to_numpy(dtype=np.float64),
+            partials["last_day"].to_numpy().astype("datetime64[D]").astype(np.int64),
+        )
+        return self
+
+    @classmethod
+    def from_partials(cls, partials):
+        return cls().merge_partials(partials)
+
+    def last_day_by_county(self):
+        """County -> last daily date already folded in."""
+        self._require_data()
+        last = self.last_days.max(axis=1).astype("datetime64[D]")
+        return pd.Series(last.astype("datetime64[ns]"), index=pd.Index(self.counties, name="County"))
+
+    def _dates(self):
+        n_months = self.sums.shape[1]
+        months = np.arange(self.first_month, self.first_month + n_months).astype("datetime64[M]")
+        return pd.DatetimeIndex(months.astype("datetime64[ns]"), name="date")
+
+    def partials(self):
+        """
+        Long table of the retained partials, one row per county-month with
+        data: date, County, AQI_sum, AQI_count, AQI_min, AQI_max, last_day.
+        """
+        self._require_data()
+        rows, cols = np.nonzero(self.counts)
+        names = np.array(self.counties, dtype=object)[rows].astype(str)
+        order = np.lexsort((cols, names))
+        rows, cols = rows[order], cols[order]
+        return pd.DataFrame({
+            "date": self._dates()[cols],
+            "County": names[order],
+            "AQI_sum": self.sums[rows, cols],
+            "AQI_count": self.counts[rows, cols],
+            "AQI_min": self.mins[rows, cols],
+            "AQI_max": self.maxs[rows, cols],
+            "last_day": self.last_days[rows, cols].astype("datetime64[D]").astype("datetime64[ns]"),
+        })
+
+    def county_monthly(self):
+        """Mean AQI per county and month, sorted by County then date."""
+        partials = self.partials()
+        partials["County_AQI"] = partials["AQI_sum"] / partials["AQI_count"]
+        return partials[["date", "County", "County_AQI"]]
+
+    def statewide_monthly(self, value_col="NY_AQI", start=None, end=None):
+        """Mean AQI over all daily rows per month, from the county partials."""
+        self._require_data()
+        dates = self._dates()
+        counts = self.counts.sum(axis=0)
+        keep = counts > 0
+        if start is not None:
+            keep &= dates >= pd.Timestamp(start)
+        if end is not None:
+            keep &= dates <= pd.Timestamp(end)
+        return pd.DataFrame({
+            "date": dates[keep],
+            value_col: self.sums.sum(axis=0)[keep] / counts[keep],
+        })
+
+    def _require_data(self):
+        if self.first_month is None:
+            raise ValueError("No AQI rows matched the requested filters")
+
+
+def aggregate_daily_aqi(path=DAILY_AQI_CSV, state=None, start=None, end=None, chunksize=CHUNKSIZE):
+    """Stream the daily file through a MonthlyAQIAggregator in one call."""
+    with span("aqi_aggregate", "aqi_monthly", path=path) as s:
+        chunks = read_aqi_chunks(path, state=state, start=start, end=end, chunksize=chunksize)
+        aggregator = MonthlyAQIAggregator().consume(chunks)
+        s.set(rows_in=int(aggregator.counts.sum()), rows_out=int(np.count_nonzero(aggregator.counts)))
+    return aggregator
+
+
+def aggregate_by_state(path=DAILY_AQI_CSV, states=None, start=None, end=None, chunksize=CHUNKSIZE):
+    """
+    One pass over a multi-state daily file: State Name -> its own
+    MonthlyAQIAggregator. `states` limits the pass to some State Names.
+    """
+    aggregators = {}
+    chunks = read_aqi_chunks(path, state=states, start=start, end=end, chunksize=chunksize, keep_state=True)
+    for chunk in chunks:
+        for state, rows in chunk.groupby(STATE_COL, observed=True):
+            aggregators.setdefault(state, MonthlyAQIAggregator()).update(rows)
+    return aggregators
+
+
+# -------------------------------------------------------------------
+# INCREMENTAL REFRESH
+# -------------------------------------------------------------------
+def append_daily(path, partials, state=None, chunksize=CHUNKSIZE):
+    """
+    Extend stored partials with newly published daily rows.
+
+    Only the new file is read. Rows dated on or before the last day already
+    folded in for their county are skipped, so re-sending an overlapping
+    file does not double count. Returns (aggregator, affected month starts).
+    """
+    aggregator = MonthlyAQIAggregator.from_partials(partials)
+    last_day = aggregator.last_day_by_county()
+
+    affected = set()
+    for chunk in read_aqi_chunks(path, state=state, chunksize=chunksize):
+        cutoff = chunk[COUNTY_COL].astype(str).map(last_day)
+        chunk = chunk[cutoff.isna().to_numpy() | (chunk[DATE_COL] > cutoff).to_numpy()]
+        if chunk.empty:
+            continue
+        aggregator.update(chunk)
+        affected.update(np.unique(chunk[DATE_COL].to_numpy().astype("datetime64[M]")))
+
+    months = pd.DatetimeIndex(sorted(affected), name="date").as_unit("ns") if affected else pd.DatetimeIndex([], name="date")
+    return aggregator, months
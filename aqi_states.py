@@ -0,0 +1,118 @@
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from aqi_monthly import (
+    CHUNKSIZE,
+    COUNTY_DATASET,
+    PARTIALS_DATASET,
+    STATE_TABLE,
+    MonthlyAQIAggregator,
+    aggregate_by_state,
+)
+from table_store import write_dataset, write_table
+from us_states import STATE_FIPS
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+DAILY_AQI_PATTERN = "daily_aqi_by_county_*.csv"  # EPA AirData annual files, all states
+START_DATE = None
+END_DATE = None
+PARTITION_COLS = ["STATEFP"]
+
+
+# -------------------------------------------------------------------
+# WORKERS
+# -------------------------------------------------------------------
+def _aggregate_file(job):
+    """One daily file -> {State Name: partials table}."""
+    path, states, start, end, chunksize = job
+    aggregators = aggregate_by_state(path, states=states, start=start, end=end, chunksize=chunksize)
+    return {state: aggregator.partials() for state, aggregator in aggregators.items()}
+
+
+def _finalize_state(job):
+    """Merge one state's partials from every file into its monthly tables."""
+    state, partials = job
+    aggregator = MonthlyAQIAggregator()
+    for table in partials:
+        aggregator.merge_partials(table)
+
+    def tag(df):
+        return df.assign(State=state, STATEFP=STATE_FIPS[state])
+
+    return (
+        tag(aggregator.county_monthly()),
+        tag(aggregator.statewide_monthly("State_AQI")),
+        tag(aggregator.partials()),
+    )
+
+
+def _map(fn, jobs, pool):
+    return list(pool.map(fn, jobs)) if pool is not None else [fn(job) for job in jobs]
+
+
+# -------------------------------------------------------------------
+# ALL STATES
+# -------------------------------------------------------------------
+def aggregate_all_states(paths, states=None, start=START_DATE, end=END_DATE, workers=None, chunksize=CHUNKSIZE):
+    """
+    Monthly county and statewide AQI for every state found in the daily
+    files. Each file is streamed in its own process (e.g. one EPA annual
+    file per task); the per-state partials are then merged and finalized
+    in parallel, one task per state.
+
+    Returns (county_monthly, state_monthly, partials), long tables with
+    State and STATEFP columns. States without a FIPS code (e.g. "Country
+    Of Mexico") are reported and dropped.
+    """
+    paths = list(paths)
+    if not paths:
+        raise ValueError("No daily AQI files given")
+
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        per_file = _map(_aggregate_file, [(path, states, start, end, chunksize) for path in paths], pool)
+
+        by_state = {}
+        for partials in per_file:
+            for state, table in partials.items():
+                by_state.setdefault(state, []).append(table)
+        unknown = sorted(state for state in by_state if state not in STATE_FIPS)
+        if unknown:
+            print(f"Skipping rows without a state FIPS code: {', '.join(unknown)}")
+        jobs = [(state, tables) for state, tables in sorted(by_state.items()) if state in STATE_FIPS]
+
+        results = _map(_finalize_state, jobs, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if not results:
+        raise ValueError("No AQI rows matched the requested filters")
+    county, state, partials = (pd.concat(frames, ignore_index=True) for frames in zip(*results))
+    return county, state, partials
+
+
+# -------------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------------
+if __name__ == "__main__":
+    # python aqi_states.py [daily.csv ...]   (default: DAILY_AQI_PATTERN)
+    paths = sys.argv[1:] or sorted(glob.glob(DAILY_AQI_PATTERN))
+    if not paths:
+        sys.exit(f"No daily AQI files matching {DAILY_AQI_PATTERN}")
+
+    county, state, partials = aggregate_all_states(paths)
+
+    write_dataset(county, COUNTY_DATASET, PARTITION_COLS)
+    write_dataset(partials, PARTIALS_DATASET, PARTITION_COLS)
+    write_table(state, STATE_TABLE)
+
+    print(f"Created {COUNTY_DATASET}: {county['STATEFP'].nunique()} states, {len(county)} county-months")
+    print(state.groupby("State", observed=True)["State_AQI"].mean().round(1).to_string())
@@ -0,0 +1,125 @@
+import fnmatch
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+
+import pandas as pd
+
+from instrumentation import traced
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional; decode every time without it
+    feather = None
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+ARCHIVE_CACHE_DIR = os.path.join("cache", "archives")
+
+
+# -------------------------------------------------------------------
+# MEMBER SELECTION
+# -------------------------------------------------------------------
+def select_member(z, pattern):
+    """
+    First archive member matching a glob pattern (e.g. "viirs_alerts*.csv"),
+    instead of trusting namelist()[0].
+    """
+    matches = sorted(name for name in z.namelist() if fnmatch.fnmatch(os.path.basename(name), pattern))
+    if not matches:
+        raise ValueError(f"No member matching {pattern!r} in {z.filename}: {z.namelist()}")
+    return matches[0]
+
+
+# -------------------------------------------------------------------
+# CACHE KEYS
+# -------------------------------------------------------------------
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_key(zip_path, pattern, usecols, dtype, content_hash=False):
+    """
+    Identify one decoded result: the archive (size + mtime, or its sha256
+    when content_hash=True) plus exactly what was read out of it.
+    """
+    st = os.stat(zip_path)
+    source = {"sha256": _sha256(zip_path)} if content_hash else {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    spec = {
+        "archive": os.path.abspath(zip_path),
+        "source": source,
+        "pattern": pattern,
+        "usecols": list(usecols) if usecols is not None else None,
+        "dtype": {col: str(t) for col, t in (dtype or {}).items()},
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:20]
+
+
+def _cache_path(zip_path, key, cache_dir):
+    stem = os.path.splitext(os.path.basename(zip_path))[0].replace(" ", "_")
+    return os.path.join(cache_dir, f"{stem}-{key}.feather")
+
+
+def _write_cache(frame, path, cache_dir):
+    """
+    Write through a temp file of this writer's own, then rename it into
+    place. Pipeline stages decode the same archives concurrently; if another
+    writer's file is already there (and can't be replaced, e.g. while it is
+    memory-mapped on Windows) theirs is kept.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    os.close(fd)
+    try:
+        feather.write_feather(frame, tmp, compression="uncompressed")
+        os.replace(tmp, path)
+    except OSError:
+        if not os.path.exists(path):
+            raise
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+# -------------------------------------------------------------------
+# READER
+# -------------------------------------------------------------------
+@traced("zip_read")
+def read_archive_csv(zip_path, pattern="*.csv", usecols=None, dtype=None,
+                     use_cache=True, content_hash=False, cache_dir=ARCHIVE_CACHE_DIR):
+    """
+    Read one CSV member out of a zip archive, keeping only `usecols` with
+    the given (narrow) dtypes. Header whitespace is stripped.
+
+    With use_cache the decoded frame is kept as a Feather file keyed by
+    cache_key(), so a re-run on an unchanged archive skips decompression
+    and CSV parsing entirely.
+    """
+    use_cache = use_cache and feather is not None
+    if use_cache:
+        path = _cache_path(zip_path, cache_key(zip_path, pattern, usecols, dtype, content_hash), cache_dir)
+        if os.path.exists(path):
+            return feather.read_table(path, memory_map=True).to_pandas()
+
+    wanted = set(usecols) if usecols is not None else None
+    with zipfile.ZipFile(zip_path) as z:
+        with z.open(select_member(z, pattern)) as f:
+            frame = pd.read_csv(
+                f,
+                usecols=(lambda col: col.strip() in wanted) if wanted is not None else None,
+                dtype=dtype,
+            )
+    frame = frame.rename(columns=str.strip)
+    if usecols is not None:
+        frame = frame[list(usecols)]
+
+    if use_cache:
+        _write_cache(frame, path, cache_dir)
+    return frame
@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from county_aqi_choroplethmap import load_data  # noqa: E402
+from county_geometry import SIMPLIFY_LEVELS  # noqa: E402
+from frame_renderer import render_frames  # noqa: E402
+
+# -------------------------------------------------------------------
+# Animation frames: full GeoDataFrame.plot per frame vs recolor-only,
+# then recolor-only at every geometry simplification level
+# Usage: python benchmarks/bench_frame_render.py [start_year] [end_year]
+# Run from the repo root so the data paths resolve.
+# -------------------------------------------------------------------
+START_YEAR = int(sys.argv[1]) if len(sys.argv) > 1 else 2020
+END_YEAR = int(sys.argv[2]) if len(sys.argv) > 2 else 2020
+
+
+if __name__ == "__main__":
+    aqi, counties = load_data()
+
+    timings = {}
+    for mode in ("redraw", "recolor"):
+        with tempfile.TemporaryDirectory() as frames_dir:
+            t0 = time.perf_counter()
+            paths = render_frames(aqi, counties, frames_dir, START_YEAR, END_YEAR, workers=1, mode=mode)
+            timings[mode] = (time.perf_counter() - t0) / max(len(paths), 1)
+
+    print(f"frames: {len(paths)} ({START_YEAR}-{END_YEAR}), counties: {len(counties)}, single worker")
+    for mode, per_frame in timings.items():
+        print(f"{mode:8s}: {per_frame * 1000:8.1f} ms/frame")
+    print(f"speedup : {timings['redraw'] / timings['recolor']:8.1f}x")
+
+    print("recolor by geometry level:")
+    for level, tolerance in SIMPLIFY_LEVELS.items():
+        aqi, counties = load_data(level)
+        n_vertices = sum(len(ring.coords) for geom in counties.geometry
+                         for poly in getattr(geom, "geoms", [geom])
+                         for ring in (poly.exterior, *poly.interiors))
+        with tempfile.TemporaryDirectory() as frames_dir:
+            t0 = time.perf_counter()
+            paths = render_frames(aqi, counties, frames_dir, START_YEAR, END_YEAR, workers=1, mode="recolor")
+            per_frame = (time.perf_counter() - t0) / max(len(paths), 1)
+        print(f"  {level:9s} ({tolerance:5d} m, {n_vertices:5d} vertices): {per_frame * 1000:8.1f} ms/frame")
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vif_ingest import iso_week_to_date  # noqa: E402
+
+# -------------------------------------------------------------------
+# ISO week -> date: string + strptime path vs integer arithmetic
+# Usage: python benchmarks/bench_iso_week.py [n_rows]
+# -------------------------------------------------------------------
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+REPEATS = 3
+
+
+def string_path(year, week):
+    """The conversion the VIF scripts used before iso_week_to_date."""
+    year_str = year.astype(int).astype(str)
+    week_str = week.astype(int).astype(str).str.zfill(2)
+    return pd.to_datetime(year_str + "-W" + week_str + "-1", format="%G-W%V-%u", errors="coerce")
+
+
+def best_of(fn, *args):
+    best = float("inf")
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    year = pd.Series(rng.integers(2001, 2026, N_ROWS))
+    week = pd.Series(rng.integers(1, 54, N_ROWS))
+
+    t_str, expected = best_of(string_path, year, week)
+    t_arith, got_arith = best_of(iso_week_to_date, year.to_numpy(), week.to_numpy(), False)
+    t_lookup, got_lookup = best_of(iso_week_to_date, year.to_numpy(), week.to_numpy(), True)
+
+    expected = expected.to_numpy().astype("datetime64[ns]")
+    for got in (got_arith, got_lookup):
+        assert np.array_equal(got, expected, equal_nan=True), "numeric path disagrees with strptime"
+
+    print(f"rows: {N_ROWS:,}")
+    print(f"string + strptime : {t_str:8.3f} s")
+    print(f"integer arithmetic: {t_arith:8.3f} s  ({t_str / t_arith:6.1f}x)")
+    print(f"distinct lookup   : {t_lookup:8.3f} s  ({t_str / t_lookup:6.1f}x)")
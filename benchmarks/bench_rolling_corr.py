@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lag_correlation import rolling_lag_correlations  # noqa: E402
+
+# -------------------------------------------------------------------
+# Rolling lag correlation on synthetic daily-length series:
+#   per-window .corr()   recompute every window from scratch (the old way)
+#   pandas rolling       rolling().corr() once per region x lag
+#   prefix sums          rolling_lag_correlations, one vectorized pass
+# Usage: python benchmarks/bench_rolling_corr.py [n_rows] [window]
+# -------------------------------------------------------------------
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+WINDOW = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+MIN_PERIODS = WINDOW // 2
+NAIVE_MAX_ROWS = 5000      # the per-window loop is too slow beyond this
+REGIONS = ["Ontario_VIF", "Quebec_VIF", "NL_VIF"]
+MAX_LAG = 6
+
+
+def synthetic(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"date": pd.date_range("2000-01-01", periods=n_rows, freq="D")})
+    for col in REGIONS:
+        df[col] = rng.poisson(rng.gamma(0.5, 20, n_rows)).astype(float)
+    df["NY_AQI"] = 40 + rng.normal(0, 10, n_rows)
+    df.loc[rng.random(n_rows) < 0.02, "NY_AQI"] = np.nan
+    return df
+
+
+def naive_surface(df, window):
+    out = np.full((len(df) - window + 1, len(REGIONS), MAX_LAG + 1), np.nan)
+    for lag in range(MAX_LAG + 1):
+        y = df["NY_AQI"].shift(-lag)
+        for w in range(len(df) - window + 1):
+            for r, col in enumerate(REGIONS):
+                x_win, y_win = df[col].iloc[w:w + window], y.iloc[w:w + window]
+                if (x_win.notna() & y_win.notna()).sum() >= MIN_PERIODS:
+                    out[w, r, lag] = x_win.corr(y_win)
+    return out
+
+
+def pandas_surface(df, window):
+    out = np.empty((len(df) - window + 1, len(REGIONS), MAX_LAG + 1))
+    for r, col in enumerate(REGIONS):
+        for lag in range(MAX_LAG + 1):
+            rolled = df[col].rolling(window, min_periods=MIN_PERIODS).corr(df["NY_AQI"].shift(-lag))
+            out[:, r, lag] = rolled.to_numpy()[window - 1:]
+    return out
+
+
+if __name__ == "__main__":
+    df = synthetic(N_ROWS)
+
+    t0 = time.perf_counter()
+    surface, *_ = rolling_lag_correlations(df, WINDOW, REGIONS, "NY_AQI", max_lag=MAX_LAG,
+                                           min_periods=MIN_PERIODS)
+    t_prefix = time.perf_counter() - t0
+
+    runs = {"pandas rolling": pandas_surface}
+    if N_ROWS <= NAIVE_MAX_ROWS:
+        runs = {"per-window .corr()": naive_surface, **runs}
+
+    print(f"rows: {N_ROWS}, window: {WINDOW}, surface: {surface.shape}")
+    print(f"{'prefix sums':20s}: {t_prefix * 1000:10.1f} ms")
+    for name, fn in runs.items():
+        t0 = time.perf_counter()
+        expected = fn(df, WINDOW)
+        elapsed = time.perf_counter() - t0
+        both = np.isfinite(expected) & np.isfinite(surface)
+        print(f"{name:20s}: {elapsed * 1000:10.1f} ms  ({elapsed / t_prefix:7.1f}x slower, "
+              f"max |diff| {np.abs(expected[both] - surface[both]).max():.1e}, "
+              f"NaN mismatches {(np.isfinite(expected) != np.isfinite(surface)).sum()})")
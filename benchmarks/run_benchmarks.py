@@ -0,0 +1,259 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS, tracemalloc only
+    resource = None
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+
+# -------------------------------------------------------------------
+# Timed, memory-tracked benchmarks on seeded synthetic inputs.
+# Usage: python benchmarks/run_benchmarks.py [--scales 1 10 100] [--only NAME ...]
+# Every (benchmark, scale) runs in a fresh process; results are appended
+# to HISTORY_PATH and compared with the previous run of the same case.
+# -------------------------------------------------------------------
+HISTORY_PATH = os.path.join(REPO_DIR, "benchmarks", "history.json")
+DATA_DIR = os.path.join(REPO_DIR, "benchmarks", ".data")   # generated inputs, reused per scale/seed
+SCALES = [1, 10]
+REPEATS = 3
+
+
+# -------------------------------------------------------------------
+# BENCHMARKS: setup(data_dir, scale, seed) -> run() -> {counters}
+# Only run() is timed; it executes inside a scratch working directory.
+# -------------------------------------------------------------------
+def vif_ingest(data_dir, scale, seed):
+    from vif_ingest import ingest_archives
+
+    archive_dir = os.path.join(data_dir, "alerts")
+    paths = [os.path.join(archive_dir, synthetic.alert_archive_name(region)) for region in synthetic.REGIONS]
+    if not all(os.path.exists(path) for path in paths):
+        paths = synthetic.make_alert_archives(archive_dir, scale, seed)
+
+    def run():
+        monthly = ingest_archives(paths, max_workers=1)
+        return {"rows_in": len(paths) * int(synthetic.ALERT_ROWS * scale), "rows_out": len(monthly)}
+    return run
+
+
+def aqi_monthly(data_dir, scale, seed):
+    from aqi_monthly import aggregate_daily_aqi
+
+    path = os.path.join(data_dir, "daily_aqi.csv")
+    if not os.path.exists(path):
+        synthetic.make_daily_aqi(path, scale, seed)
+
+    def run():
+        aggregator = aggregate_daily_aqi(path, state="New York")
+        county = aggregator.county_monthly()
+        aggregator.statewide_monthly()
+        return {"rows_in": int(aggregator.counts.sum()), "rows_out": len(county)}
+    return run
+
+
+def aqi_states(data_dir, scale, seed):
+    from aqi_states import aggregate_all_states
+
+    years = range(synthetic.AQI_STATE_YEARS[0], synthetic.AQI_STATE_YEARS[1] + 1)
+    paths = [os.path.join(data_dir, "annual", synthetic.annual_aqi_name(year)) for year in years]
+    if not all(os.path.exists(path) for path in paths):
+        paths = synthetic.make_annual_aqi_files(os.path.join(data_dir, "annual"), scale, seed)
+
+    def run():
+        county, state, partials = aggregate_all_states(paths, workers=1)
+        return {"rows_in": int(partials["AQI_count"].sum()), "rows_out": len(county)}
+    return run
+
+
+def lag_correlation(data_dir, scale, seed):
+    from lag_correlation import county_lag_cube, lag_correlations, rolling_lag_correlations
+
+    merged = synthetic.merged_vif_table(1, seed)
+    long_merged = synthetic.merged_vif_table(scale, seed)
+    county_aqi = synthetic.county_aqi_table(merged["date"], scale, seed)
+
+    def run():
+        lag_correlations(merged)
+        cube, counties, _, _ = county_lag_cube(county_aqi, merged)
+        surface, *_ = rolling_lag_correlations(long_merged, 24)
+        return {"rows_in": len(county_aqi) + len(long_merged), "rows_out": cube.size + surface.size}
+    return run
+
+
+def frame_render(data_dir, scale, seed):
+    import geopandas as gpd
+
+    from frame_renderer import render_frames
+
+    path = os.path.join(data_dir, "shapes", f"counties_x{scale}.shp")
+    if not os.path.exists(path):
+        path = synthetic.make_county_shapefile(os.path.dirname(path), scale, seed)
+    counties = gpd.read_file(path)
+    aqi = synthetic.monthly_county_aqi(counties["County"], months=12, seed=seed)
+
+    def run():
+        frames = render_frames(aqi, counties, "frames", 2020, 2020, workers=1, mode="recolor")
+        return {"rows_in": len(counties), "rows_out": len(frames)}
+    return run
+
+
+BENCHMARKS = {
+    "vif_ingest": vif_ingest,
+    "aqi_monthly": aqi_monthly,
+    "aqi_states": aqi_states,
+    "lag_correlation": lag_correlation,
+    "frame_render": frame_render,
+}
+
+
+# -------------------------------------------------------------------
+# HARNESS (runs in a fresh worker process per case)
+# -------------------------------------------------------------------
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _run_case(name, scale, seed, repeats, data_dir):
+    import matplotlib
+
+    matplotlib.use("Agg", force=True)
+    case_data = os.path.join(data_dir, f"x{scale}-seed{seed}")
+    os.makedirs(case_data, exist_ok=True)
+    run = BENCHMARKS[name](case_data, scale, seed)
+
+    scratch = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    os.chdir(scratch)
+    try:
+        times, cpu_times = [], []
+        for _ in range(repeats):
+            shutil.rmtree(os.path.join(scratch, "cache"), ignore_errors=True)  # always a cold decode
+            gc.collect()
+            t0, c0 = time.perf_counter(), time.process_time()
+            counters = run()
+            times.append(time.perf_counter() - t0)
+            cpu_times.append(time.process_time() - c0)
+
+        # separate traced pass: tracemalloc slows allocation-heavy code down
+        shutil.rmtree(os.path.join(scratch, "cache"), ignore_errors=True)
+        gc.collect()
+        tracemalloc.start()
+        run()
+        _, peak_traced = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.chdir(REPO_DIR)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return {
+        "benchmark": name,
+        "scale": scale,
+        "seconds": round(min(times), 4),
+        "seconds_all": [round(t, 4) for t in times],
+        "cpu_seconds": round(min(cpu_times), 4),
+        "peak_traced_mb": round(peak_traced / 2**20, 2),
+        "peak_rss_mb": _peak_rss_mb(),
+        **counters,
+    }
+
+
+# -------------------------------------------------------------------
+# HISTORY
+# -------------------------------------------------------------------
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return {"runs": []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def previous_result(history, name, scale):
+    """Most recent earlier result for the same benchmark and scale."""
+    for past in reversed(history["runs"]):
+        for result in past["results"]:
+            if result["benchmark"] == name and result["scale"] == scale:
+                return result, past
+    return None, None
+
+
+def run_benchmarks(names=None, scales=SCALES, seed=0, repeats=REPEATS,
+                   data_dir=DATA_DIR, history_path=HISTORY_PATH):
+    names = list(names or BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    data_dir = os.path.abspath(data_dir)
+    history = load_history(history_path)
+    results = []
+    for name in names:
+        for scale in scales:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(_run_case, name, scale, seed, repeats, data_dir).result()
+            results.append(result)
+
+            before, past = previous_result(history, name, scale)
+            change = ""
+            if before is not None:
+                change = f"  ({result['seconds'] / before['seconds']:.2f}x vs {past['commit'] or past['timestamp']})"
+            print(f"{name:16s} x{scale:<4d} {result['seconds'] * 1000:10.1f} ms  "
+                  f"traced {result['peak_traced_mb']:8.1f} MB  rss {result['peak_rss_mb']} MB{change}")
+
+    history["runs"].append({
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "repeats": repeats,
+        "results": results,
+    })
+    os.makedirs(os.path.dirname(history_path), exist_ok=True)
+    with open(history_path, "w") as f:
+        json.dump(history, f, indent=2)
+    return results
+
+
+# -------------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, aggregation, correlation and rendering.")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="subset of benchmarks")
+    parser.add_argument("--scales", nargs="+", type=int, default=SCALES, help="input sizes, e.g. 1 10 100")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--history", default=HISTORY_PATH)
+    args = parser.parse_args()
+
+    run_benchmarks(args.only, args.scales, args.seed, args.repeats, args.data_dir, args.history)
+    print(f"History: {args.history}")
@@ -0,0 +1,221 @@
+import os
+import sys
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+from county_geometry import PLOT_CRS, SHAPEFILE_PATH  # noqa: E402
+from us_states import STATE_FIPS  # noqa: E402
+
+# -------------------------------------------------------------------
+# Seeded synthetic inputs, sized relative to the real ones (scale=1):
+#   alert archive     ~1,000 weekly rows per province
+#   daily AQI file    28 NY counties x 1980-2021, ~330k rows
+#   annual AQI files  8 states x 12 counties, one file per 2015-2021 year,
+#                     ~28k rows each (EPA "daily_aqi_by_county_<year>.csv")
+#   county shapefile  the 62 NY counties (scale > 1 adds whole states)
+#   monthly table     144 months (2010-2021) x 3 regions + NY AQI
+# -------------------------------------------------------------------
+ALERT_ROWS = 1_000
+ALERT_YEARS = (2001, 2025)
+AQI_COUNTIES = 28
+AQI_YEARS = (1980, 2021)
+AQI_REPORTING = 0.8          # share of county-days with a reading
+AQI_CHUNK_DAYS = 2_000       # days written per to_csv call
+AQI_STATES = ["New York", "Vermont", "Pennsylvania", "Ohio", "California", "Texas", "Florida", "Washington"]
+AQI_STATE_COUNTIES = 12      # counties per state in the all-states files
+AQI_STATE_YEARS = (2015, 2021)
+MONTHS = 144
+NY_STATEFP = "36"
+REGIONS = ["Ontario", "Québec", "Newfoundland and Labrador"]
+
+
+def _rng(seed, *salt):
+    return np.random.default_rng([seed, *salt])
+
+
+# -------------------------------------------------------------------
+# VIF ALERT ARCHIVES
+# -------------------------------------------------------------------
+def alert_archive_name(region):
+    return f"Historical Fire Alerts in {region}, Canada.zip"
+
+
+def make_alert_archive(out_dir, region, scale=1, seed=0):
+    """GFW-style archive with viirs_alerts__count.csv at ~ALERT_ROWS * scale rows."""
+    rng = _rng(seed, REGIONS.index(region) if region in REGIONS else len(REGIONS))
+    n = int(ALERT_ROWS * scale)
+    years = rng.integers(ALERT_YEARS[0], ALERT_YEARS[1] + 1, n)
+    weeks = rng.integers(1, 54, n)
+    # fire season: many more alerts in summer weeks
+    season = np.exp(-((weeks - 30) / 8.0) ** 2)
+    counts = rng.poisson(1 + 400 * season * rng.gamma(0.6, 1.0, n))
+    alerts = pd.DataFrame({
+        "alert__week": weeks,
+        "alert__year": years,
+        "alert__count": counts,
+        "confidence__cat": rng.choice(["h", "n", "l"], n),
+    })
+
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, alert_archive_name(region))
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        z.writestr("viirs_alerts__count.csv", alerts.to_csv(index=False, quoting=1))
+        z.writestr("metadata.csv", "name,value\nsynthetic,1\n")
+    return path
+
+
+def make_alert_archives(out_dir, scale=1, seed=0):
+    return [make_alert_archive(out_dir, region, scale, seed) for region in REGIONS]
+
+
+# -------------------------------------------------------------------
+# DAILY AQI
+# -------------------------------------------------------------------
+def _write_daily_aqi(path, rng, days, states, counties, county_col="County Name"):
+    """
+    Write daily AQI rows for parallel arrays of (state, county) over `days`,
+    in day blocks, so 100x never holds the whole table in memory.
+    """
+    states, counties = np.asarray(states), np.asarray(counties)
+    n_counties = len(counties)
+    level = rng.gamma(6.0, 6.0, n_counties)
+    codes = np.array([int(STATE_FIPS.get(state, "80")) for state in states])
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    header = True
+    with open(path, "w", newline="") as f:
+        for start in range(0, len(days), AQI_CHUNK_DAYS):
+            block = days[start:start + AQI_CHUNK_DAYS]
+            day_idx = np.repeat(np.arange(len(block)), n_counties)
+            county_idx = np.tile(np.arange(n_counties), len(block))
+            keep = rng.random(len(day_idx)) < AQI_REPORTING
+            day_idx, county_idx = day_idx[keep], county_idx[keep]
+
+            season = 1 + 0.3 * np.sin(2 * np.pi * block.dayofyear.to_numpy()[day_idx] / 365.25)
+            aqi = np.clip(level[county_idx] * season + rng.normal(0, 8, len(day_idx)), 0, 500).astype(int)
+            pd.DataFrame({
+                "State Name": states[county_idx],
+                county_col: counties[county_idx],
+                "State Code": codes[county_idx],
+                "County Code": county_idx + 1,
+                "Date": block.strftime("%Y-%m-%d").to_numpy()[day_idx],
+                "AQI": aqi,
+                "Category": np.where(aqi <= 50, "Good", "Moderate"),
+            }).to_csv(f, index=False, header=header)
+            header = False
+    return path
+
+
+def make_daily_aqi(path, scale=1, seed=0, state="New York"):
+    """
+    EPA-style daily AQI by county (State Name, County Name, State Code,
+    County Code, Date, AQI, Category) for AQI_COUNTIES * scale counties.
+    """
+    n_counties = int(AQI_COUNTIES * scale)
+    counties = [f"County {i:04d}" for i in range(n_counties)]
+    days = pd.date_range(f"{AQI_YEARS[0]}-01-01", f"{AQI_YEARS[1]}-12-31", freq="D")
+    return _write_daily_aqi(path, _rng(seed, 1), days, [state] * n_counties, counties)
+
+
+def annual_aqi_name(year):
+    return f"daily_aqi_by_county_{year}.csv"
+
+
+def make_annual_aqi_files(out_dir, scale=1, seed=0, states=AQI_STATES, years=AQI_STATE_YEARS):
+    """
+    One all-states file per year, shaped like the EPA annual downloads:
+    the same header spellings ("county Name"), AQI_STATE_COUNTIES * scale
+    counties in every state (names repeat across states, as real ones do)
+    and a few "Country Of Mexico" monitors without a state FIPS code.
+    """
+    n_counties = int(AQI_STATE_COUNTIES * scale)
+    names = [f"County {i:04d}" for i in range(n_counties)]
+    row_states = [state for state in states for _ in names] + ["Country Of Mexico"] * 2
+    row_counties = names * len(states) + ["Tijuana", "Juarez"]
+
+    paths = []
+    for year in range(years[0], years[1] + 1):
+        days = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D")
+        path = os.path.join(out_dir, annual_aqi_name(year))
+        paths.append(_write_daily_aqi(path, _rng(seed, 6, year), days, row_states, row_counties,
+                                      county_col="county Name"))
+    return paths
+
+
+# -------------------------------------------------------------------
+# COUNTY SHAPEFILE SUBSETS
+# -------------------------------------------------------------------
+def county_subset(scale=1, seed=0, shapefile=os.path.join(REPO_DIR, SHAPEFILE_PATH)):
+    """
+    NY counties plus enough randomly drawn whole states to reach
+    ~62 * scale counties (capped at the whole national file), in PLOT_CRS
+    with a unique County name per polygon.
+    """
+    import geopandas as gpd
+
+    counties = gpd.read_file(shapefile)
+    target = 62 * scale
+    rng = _rng(seed, 2)
+    others = [fp for fp in rng.permutation(sorted(counties["STATEFP"].unique())) if fp != NY_STATEFP]
+
+    chosen, total = [NY_STATEFP], int((counties["STATEFP"] == NY_STATEFP).sum())
+    for statefp in others:
+        if total >= target:
+            break
+        chosen.append(statefp)
+        total += int((counties["STATEFP"] == statefp).sum())
+
+    subset = counties[counties["STATEFP"].isin(chosen)].to_crs(PLOT_CRS).reset_index(drop=True)
+    subset = subset[["STATEFP", "COUNTYFP", "GEOID", "NAME", "geometry"]]
+    subset["County"] = subset["GEOID"]
+    return subset
+
+
+def make_county_shapefile(out_dir, scale=1, seed=0):
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"counties_x{scale}.shp")
+    county_subset(scale, seed).to_file(path)
+    return path
+
+
+def monthly_county_aqi(counties, months=12, seed=0, start="2020-01-01"):
+    """Long (date, County, County_AQI) table for rendering frames."""
+    rng = _rng(seed, 3)
+    dates = pd.date_range(start, periods=months, freq="MS")
+    return pd.DataFrame({
+        "date": np.repeat(dates, len(counties)),
+        "County": np.tile(np.asarray(counties), months),
+        "County_AQI": rng.gamma(6.0, 6.0, months * len(counties)),
+    })
+
+
+# -------------------------------------------------------------------
+# MONTHLY VIF + AQI
+# -------------------------------------------------------------------
+def merged_vif_table(scale=1, seed=0):
+    """merged_ny_vif-shaped table over MONTHS * scale months."""
+    rng = _rng(seed, 4)
+    n = int(MONTHS * scale)
+    dates = pd.date_range("2010-01-01", periods=n, freq="MS")
+    season = np.exp(-((dates.month.to_numpy() - 7) / 1.5) ** 2)
+    df = pd.DataFrame({"date": dates})
+    for col in ["Ontario_VIF", "Quebec_VIF", "NL_VIF"]:
+        df[col] = rng.poisson(1 + 3000 * season * rng.gamma(0.5, 1.0, n)).astype(float)
+    df["NY_AQI"] = 40 + 0.002 * df["Ontario_VIF"].shift(2).fillna(0) + rng.normal(0, 5, n)
+    return df
+
+
+def county_aqi_table(dates, scale=1, seed=0):
+    """Long monthly county AQI for AQI_COUNTIES * scale counties, some gaps."""
+    rng = _rng(seed, 5)
+    n_counties = int(AQI_COUNTIES * scale)
+    df = pd.DataFrame({
+        "date": np.repeat(pd.DatetimeIndex(dates), n_counties),
+        "County": np.tile([f"County {i:04d}" for i in range(n_counties)], len(dates)),
+        "County_AQI": rng.gamma(6.0, 6.0, len(dates) * n_counties),
+    })
+    return df[rng.random(len(df)) < 0.9].reset_index(drop=True)
@@ -1,16 +1,25 @@
 import os
-import pandas as pd
-import geopandas as gpd
+from functools import lru_cache
+
 import matplotlib.pyplot as plt
 
+from aqi_monthly import COUNTY_DATASET
+from county_geometry import NY_STATEFP, level_for_resolution, state_counties
+from figure_output import DEFAULT_DPI, DEFAULT_FORMATS, save_figure
+from frame_renderer import FRAME_STYLE, encode_frames, render_frames
+from smoke_exposure import county_exposure
+from table_store import dataset_exists, read_dataset, read_table
+from us_states import state_abbr, state_name
+
 # -------------------------------------------------------------------
 # CONFIG
 # -------------------------------------------------------------------
-SHAPEFILE_PATH = r"shapefiles/cb_2018_us_county_5m/cb_2018_us_county_5m.shp"
-COUNTY_AQI_CSV = r"ny_monthly_county_aqi.csv"
-MERGED_VIF_CSV = r"merged_ny_vif.csv"   # for the VIF vs AQI panel
+COUNTY_AQI_TABLE = "ny_monthly_county_aqi"  # NY; other states come from COUNTY_DATASET
+MERGED_VIF_TABLE = "merged_ny_vif"      # for the VIF vs AQI panel
+COUNTY_CORR_TABLE = "county_vif_lag_correlations"  # from county_vif_correlations.py
 FRAMES_DIR = r"a qi_frames"             # folder for animation frames
 os.makedirs(FRAMES_DIR, exist_ok=True)
+STATIC_MAP_FIGSIZE = (8, 9)             # also drives the geometry level choice
 
 # Downstate vs Upstate split for regional averages
 DOWNSTATE_COUNTIES = {
@@ -19,31 +28,92 @@ DOWNSTATE_COUNTIES = {
 }
 
 # -------------------------------------------------------------------
-# LOAD DATA
+# LOAD DATA (once per process)
 # -------------------------------------------------------------------
-def load_data():
-    aqi = pd.read_csv(COUNTY_AQI_CSV, parse_dates=["date"])
-    counties = gpd.read_file(SHAPEFILE_PATH)
+@lru_cache(maxsize=None)
+def _county_aqi(statefp=NY_STATEFP):
+    """
+    NY reads the pipeline's ny_monthly_county_aqi table; any other state
+    reads only its own partition of the all-states dataset (aqi_states.py).
+    """
+    if statefp == NY_STATEFP:
+        aqi = read_table(COUNTY_AQI_TABLE)
+    elif dataset_exists(COUNTY_DATASET):
+        aqi = read_dataset(COUNTY_DATASET, filters=[("STATEFP", "=", statefp)],
+                           columns=["date", "County", "County_AQI"])
+    else:
+        raise FileNotFoundError(f"No {COUNTY_DATASET} dataset for STATEFP {statefp}; run aqi_states.py first")
+    aqi["County"] = aqi["County"].str.strip()
+    return aqi
 
-    # Keep only New York
-    ny_counties = counties[counties["STATEFP"] == "36"].copy()
-    ny_counties["County"] = ny_counties["NAME"].str.strip()
 
-    # Small cleanup
-    aqi["County"] = aqi["County"].str.strip()
-    return aqi, ny_counties
+@lru_cache(maxsize=None)
+def _merged_vif():
+    return read_table(MERGED_VIF_TABLE)
+
+
+def load_county_aqi(statefp=NY_STATEFP):
+    return _county_aqi(statefp).copy()
+
+
+def load_counties(statefp=NY_STATEFP, level="full"):
+    """County polygons at one county_geometry.SIMPLIFY_LEVELS level."""
+    return state_counties(statefp, level).copy()
+
+
+def load_merged_vif():
+    return _merged_vif().copy()
+
+
+def load_data(level="full", statefp=NY_STATEFP):
+    """(county AQI, county polygons) for one state, read once and shared by every plot."""
+    return load_county_aqi(statefp), load_counties(statefp, level)
+
+
+def clear_data_cache():
+    """Forget the in-memory tables, e.g. after re-running ny_county_aqi.py."""
+    for loader in (state_counties, _county_aqi, _merged_vif):
+        loader.cache_clear()
+
+
+# -------------------------------------------------------------------
+# LABELS
+# -------------------------------------------------------------------
+def label_counties(ax, counties, value_col=None, top_n=None, fontsize=8):
+    """
+    Write county names at their precomputed anchors (label_x / label_y,
+    already in the plotting CRS). With value_col and top_n only the top_n
+    highest-valued counties are labelled; top_n=None labels every county.
+    Returns the Text artists.
+    """
+    labels = counties
+    if top_n is not None:
+        labels = counties.dropna(subset=[value_col]).nlargest(top_n, value_col)
+    return [
+        ax.text(x, y, name, fontsize=fontsize, ha="center", va="center")
+        for x, y, name in zip(labels["label_x"].to_numpy(), labels["label_y"].to_numpy(),
+                              labels["County"].to_numpy())
+    ]
 
 
 # -------------------------------------------------------------------
 # 1. STATIC MAP FOR A GIVEN YEAR/MONTH + PNG + LABELS
 # -------------------------------------------------------------------
-def plot_static_map(target_year=2020, target_month=None, save_png=True):
+def plot_static_map(target_year=2020, target_month=None, save_png=True,
+                    out_dir=".", formats=DEFAULT_FORMATS, dpi=DEFAULT_DPI, show=True, level=None,
+                    label_top_n=5, statefp=NY_STATEFP):
     """
     target_month: 1-12 or None.
       - If None: plot YEAR AVERAGE
       - Else: plot that specific month of that year
+    level: county_geometry.SIMPLIFY_LEVELS name; None picks it from dpi.
+    label_top_n: label the N highest-AQI counties (None = all, 0 = none).
+    statefp: state to map (NY by default).
+    Returns the saved file paths.
     """
-    aqi, ny_counties = load_data()
+    if level is None:
+        level = level_for_resolution(STATIC_MAP_FIGSIZE, dpi, statefp)
+    aqi, counties = load_data(level, statefp)
 
     if target_month is None:
         # Yearly average per county
@@ -58,9 +128,9 @@ def plot_static_map(target_year=2020, target_month=None, save_png=True):
         aqi_sel = aqi_sel.groupby("County", as_index=False)["County_AQI"].mean()
         title_suffix = f"AQI {target_year}-{target_month:02d}"
 
-    merged = ny_counties.merge(aqi_sel, on="County", how="left")
+    merged = counties.merge(aqi_sel, on="County", how="left")
 
-    fig, ax = plt.subplots(1, 1, figsize=(8, 9))
+    fig, ax = plt.subplots(1, 1, figsize=STATIC_MAP_FIGSIZE)
     merged.plot(
         ax=ax,
         column="County_AQI",
@@ -71,77 +141,60 @@ def plot_static_map(target_year=2020, target_month=None, save_png=True):
         missing_kwds={"color": "lightgrey", "label": "No data"},
     )
 
-    ax.set_title(f"New York County AQI — {title_suffix}", fontsize=16)
+    ax.set_title(f"{state_name(statefp)} County AQI — {title_suffix}", fontsize=16)
     ax.axis("off")
 
-    # Label top 5 worst counties to avoid clutter
-    top5 = aqi_sel.sort_values("County_AQI", ascending=False).head(5)["County"].tolist()
-    merged_lab = merged[merged["County"].isin(top5)].to_crs(epsg=3857)
-    for _, row in merged_lab.iterrows():
-        x, y = row["geometry"].centroid.coords[0]
-        ax.text(x, y, row["County"], fontsize=8, ha="center", va="center")
+    # Label the worst counties only, to avoid clutter
+    label_counties(ax, merged, value_col="County_AQI", top_n=label_top_n)
 
     plt.tight_layout()
 
+    paths = []
     if save_png:
-        out_name = f"ny_county_aqi_{title_suffix.replace(' ', '_').replace(':', '')}.png"
-        plt.savefig(out_name, dpi=300)
-        print(f"Saved {out_name}")
+        stem = f"{state_abbr(statefp).lower()}_county_aqi_{title_suffix.replace(' ', '_').replace(':', '')}"
+        paths = save_figure(fig, stem, out_dir, formats, dpi)
 
-    plt.show()
+    if show:
+        plt.show()
+    return paths
 
 
 # -------------------------------------------------------------------
 # 2. ANIMATION FRAMES: ONE PNG PER MONTH
 # -------------------------------------------------------------------
-def make_animation_frames(start_year=2015, end_year=2021):
+def make_animation_frames(start_year=2015, end_year=2021, workers=None, animation_path=None, fps=4,
+                          mode="recolor", level=None, statefp=NY_STATEFP):
     """
-    Generates one PNG per (year, month) in FRAMES_DIR.
-    You can stitch them into a GIF with imagemagick/ffmpeg later.
+    Generates one PNG per (year, month) in FRAMES_DIR, rendered in parallel
+    worker processes with the Agg backend.
+    animation_path: optional "*.gif" / "*.mp4" to encode the frames into.
+    mode: "recolor" draws the county outlines once and only updates fill
+          colors per frame; "redraw" re-plots the GeoDataFrame every frame.
+    level: county_geometry.SIMPLIFY_LEVELS name; None picks it from the
+           frame size and dpi in FRAME_STYLE.
+    statefp: state to animate (NY by default).
     """
-    aqi, ny_counties = load_data()
-
-    # We’ll iterate over unique year-month combinations
-    aqi["Year"] = aqi["date"].dt.year
-    aqi["Month"] = aqi["date"].dt.month
+    if level is None:
+        level = level_for_resolution(FRAME_STYLE["figsize"], FRAME_STYLE["dpi"], statefp)
+    aqi, counties = load_data(level, statefp)
 
-    for year in range(start_year, end_year + 1):
-        for month in range(1, 13):
-            sub = aqi[(aqi["Year"] == year) & (aqi["Month"] == month)]
-            if sub.empty:
-                continue
+    abbr = state_abbr(statefp)
+    frame_paths = render_frames(aqi, counties, FRAMES_DIR, start_year, end_year,
+                                workers=workers, mode=mode, style={"title": f"{abbr} County AQI"},
+                                prefix=f"{abbr.lower()}_aqi")
+    print(f"Saved {len(frame_paths)} frames to {FRAMES_DIR}")
 
-            aqi_sel = sub.groupby("County", as_index=False)["County_AQI"].mean()
-            merged = ny_counties.merge(aqi_sel, on="County", how="left")
-
-            fig, ax = plt.subplots(1, 1, figsize=(6, 7))
-            merged.plot(
-                ax=ax,
-                column="County_AQI",
-                cmap="YlOrRd",
-                legend=False,
-                edgecolor="black",
-                linewidth=0.25,
-                missing_kwds={"color": "lightgrey"},
-            )
-            ax.set_title(f"NY County AQI — {year}-{month:02d}", fontsize=12)
-            ax.axis("off")
-            plt.tight_layout()
-
-            frame_path = os.path.join(FRAMES_DIR, f"ny_aqi_{year}_{month:02d}.png")
-            plt.savefig(frame_path, dpi=150)
-            plt.close(fig)
-
-            print(f"Saved frame {frame_path}")
-
-    print("Done generating frames. Use ffmpeg or an online tool to make a GIF.")
+    if animation_path is not None:
+        encode_frames(frame_paths, animation_path, fps=fps)
+        print(f"Saved {animation_path}")
+    return frame_paths
 
 
 # -------------------------------------------------------------------
 # 3. REGIONAL AVERAGES (UPSTATE vs DOWNSTATE)
 # -------------------------------------------------------------------
-def plot_regional_averages():
-    aqi, _ = load_data()
+def plot_regional_averages(out_dir=".", formats=DEFAULT_FORMATS, dpi=DEFAULT_DPI, show=True):
+    aqi = load_county_aqi()
 
     def classify_region(county):
         return "Downstate" if county in DOWNSTATE_COUNTIES else "Upstate"
@@ -155,7 +208,7 @@ def plot_regional_averages():
 
     pivot = region_ts.pivot(index="date", columns="Region", values="County_AQI")
 
-    plt.figure(figsize=(10, 5))
+    fig = plt.figure(figsize=(10, 5))
     plt.plot(pivot.index, pivot["Downstate"], label="Downstate", linewidth=2)
     plt.plot(pivot.index, pivot["Upstate"], label="Upstate", linewidth=2)
     plt.ylabel("Average AQI")
@@ -164,21 +217,23 @@ def plot_regional_averages():
     plt.legend()
     plt.grid(True)
     plt.tight_layout()
-    plt.savefig("ny_upstate_downstate_aqi.png", dpi=300)
-    print("Saved ny_upstate_downstate_aqi.png")
-    plt.show()
+    paths = save_figure(fig, "ny_upstate_downstate_aqi", out_dir, formats, dpi)
+    if show:
+        plt.show()
+    return paths
 
 
 # -------------------------------------------------------------------
 # 4. SIDE-BY-SIDE MAP + VIF vs AQI PANEL FOR A GIVEN YEAR
 # -------------------------------------------------------------------
-def plot_map_with_vif_panel(target_year=2020, target_month=None):
+def plot_map_with_vif_panel(target_year=2020, target_month=None,
+                            out_dir=".", formats=DEFAULT_FORMATS, dpi=DEFAULT_DPI, show=True):
     """
     Left: county AQI map (year average or given month).
     Right: line plot of ON/QC/NL VIF + NY AQI for same year.
     """
     aqi, ny_counties = load_data()
-    merged_vif = pd.read_csv(MERGED_VIF_CSV, parse_dates=["date"])
+    merged_vif = load_merged_vif()
 
     # ---- county AQI selection ----
     if target_month is None:
@@ -234,10 +289,92 @@ def plot_map_with_vif_panel(target_year=2020, target_month=None):
     ax_ts.grid(True)
 
     plt.tight_layout()
-    out_name = f"ny_map_vif_panel_{map_title_suffix.replace(' ', '_')}.png"
-    plt.savefig(out_name, dpi=300)
-    print(f"Saved {out_name}")
-    plt.show()
+    paths = save_figure(fig, f"ny_map_vif_panel_{map_title_suffix.replace(' ', '_')}", out_dir, formats, dpi)
+    if show:
+        plt.show()
+    return paths
+
+
+# -------------------------------------------------------------------
+# 5. COUNTY MAP OF VIF vs AQI LAG CORRELATION
+# -------------------------------------------------------------------
+def plot_county_lag_correlation(region="Ontario_VIF", lag=0,
+                                out_dir=".", formats=DEFAULT_FORMATS, dpi=DEFAULT_DPI, show=True):
+    """
+    Colors each county by the correlation of `region`'s VIF with that
+    county's AQI `lag` months later (see county_vif_correlations.py).
+    """
+    corr = read_table(COUNTY_CORR_TABLE)
+    sel = corr[(corr["Region"] == region) & (corr["lag"] == lag)]
+    sel = sel.assign(County=sel["County"].astype(str))[["County", "r"]]
+
+    merged = load_counties().merge(sel, on="County", how="left")
+
+    fig, ax = plt.subplots(1, 1, figsize=(8, 9))
+    merged.plot(
+        ax=ax,
+        column="r",
+        cmap="RdBu_r",
+        vmin=-1,
+        vmax=1,
+        legend=True,
+        edgecolor="black",
+        linewidth=0.4,
+        missing_kwds={"color": "lightgrey", "label": "No data"},
+    )
+    ax.set_title(f"{region} vs County AQI — lag {lag} months", fontsize=16)
+    ax.axis("off")
+    plt.tight_layout()
+
+    paths = save_figure(fig, f"ny_county_corr_{region}_lag{lag}", out_dir, formats, dpi)
+    if show:
+        plt.show()
+    return paths
+
+
+# -------------------------------------------------------------------
+# 6. DISTANCE-WEIGHTED SMOKE EXPOSURE MAP
+# -------------------------------------------------------------------
+def plot_smoke_exposure(target_year=2020, target_month=None, out_dir=".", formats=DEFAULT_FORMATS,
+                        dpi=DEFAULT_DPI, show=True, level=None, statefp=NY_STATEFP):
+    """
+    Colors each county by its distance-weighted VIF exposure
+    (smoke_exposure.py): the year average, or one month when target_month
+    is given.
+    """
+    if level is None:
+        level = level_for_resolution(STATIC_MAP_FIGSIZE, dpi, statefp)
+    exposure = county_exposure(load_merged_vif(), statefp)
+
+    mask = exposure["date"].dt.year == target_year
+    title_suffix = f"Average {target_year}"
+    if target_month is not None:
+        mask &= exposure["date"].dt.month == target_month
+        title_suffix = f"{target_year}-{target_month:02d}"
+    exposure_sel = exposure[mask].groupby("County", as_index=False)["Exposure"].mean()
+
+    merged = load_counties(statefp, level).merge(exposure_sel, on="County", how="left")
+
+    fig, ax = plt.subplots(1, 1, figsize=STATIC_MAP_FIGSIZE)
+    merged.plot(
+        ax=ax,
+        column="Exposure",
+        cmap="Oranges",
+        legend=True,
+        legend_kwds={"label": "Weighted VIF alerts (1000 km equivalent)"},
+        edgecolor="black",
+        linewidth=0.4,
+        missing_kwds={"color": "lightgrey", "label": "No data"},
+    )
+    ax.set_title(f"{state_name(statefp)} Smoke Exposure — {title_suffix}", fontsize=16)
+    ax.axis("off")
+    plt.tight_layout()
+
+    paths = save_figure(fig, f"{state_abbr(statefp).lower()}_smoke_exposure_{title_suffix.replace(' ', '_')}",
+                        out_dir, formats, dpi)
+    if show:
+        plt.show()
+    return paths
 
 
 # -------------------------------------------------------------------
@@ -253,5 +390,8 @@ if __name__ == "__main__":
     # 3) Side-by-side map + VIF panel for 2020
     plot_map_with_vif_panel(target_year=2020, target_month=None)
 
-    # 4) OPTIONAL: generate frames for animation
-    # make_animation_frames(start_year=2015, end_year=2021)
+    # 4) Distance-weighted smoke exposure for 2020
+    plot_smoke_exposure(target_year=2020)
+
+    # 5) OPTIONAL: generate frames (and a GIF) for animation
+    # make_animation_frames(start_year=2015, end_year=2021, animation_path="ny_aqi.gif")
@@ -0,0 +1,173 @@
+import os
+import sys
+from functools import lru_cache
+
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+from instrumentation import traced
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+SHAPEFILE_PATH = r"shapefiles/cb_2018_us_county_5m/cb_2018_us_county_5m.shp"
+GEOMETRY_CACHE_DIR = r"cache"           # pre-filtered, pre-projected, pre-simplified counties
+NY_STATEFP = "36"
+PLOT_CRS = "EPSG:5070"                  # CONUS Albers equal-area, in metres
+
+# Simplification tolerance per level, in PLOT_CRS metres (0 = source geometry).
+# NY spans ~670 km, so a 2400 px wide figure is ~280 m per pixel.
+SIMPLIFY_LEVELS = {
+    "full": 0,
+    "fine": 250,
+    "medium": 500,
+    "coarse": 1000,
+    "thumbnail": 2500,
+}
+PIXEL_TOLERANCE = 1.0                   # allowed vertex shift, in output pixels
+
+COUNTY_COLUMNS = ["STATEFP", "COUNTYFP", "GEOID", "NAME", "geometry"]
+LABEL_COLUMNS = ["label_x", "label_y"]  # label anchor per county, in PLOT_CRS
+
+
+# -------------------------------------------------------------------
+# SIMPLIFICATION
+# -------------------------------------------------------------------
+def simplify_coverage(geoms, tolerance):
+    """
+    Topology-preserving simplification of a set of adjacent polygons.
+    coverage_simplify (GEOS >= 3.12) simplifies every shared edge once, so
+    neighbouring counties stay gap- and overlap-free; older GEOS falls back
+    to per-polygon simplify(preserve_topology=True).
+    """
+    if not tolerance:
+        return geoms
+    if hasattr(shapely, "coverage_simplify") and shapely.geos_version >= (3, 12, 0):
+        return shapely.coverage_simplify(geoms, tolerance)
+    return shapely.simplify(geoms, tolerance, preserve_topology=True)
+
+
+def simplify_levels(state, levels=SIMPLIFY_LEVELS):
+    """level name -> copy of `state` with simplified geometry."""
+    out = {}
+    for name, tolerance in levels.items():
+        geoms = simplify_coverage(state.geometry.to_numpy(), tolerance)
+        out[name] = state.set_geometry(gpd.GeoSeries(geoms, index=state.index, crs=state.crs))
+    return out
+
+
+# -------------------------------------------------------------------
+# DISK CACHE
+# -------------------------------------------------------------------
+def geometry_cache_path(statefp, level="full"):
+    return os.path.join(GEOMETRY_CACHE_DIR, f"counties_{statefp}_{level}.parquet")
+
+
+def _cache_is_fresh(cache_path):
+    if not os.path.exists(cache_path):
+        return False
+    stem = os.path.splitext(SHAPEFILE_PATH)[0]
+    sources = [stem + ext for ext in (".shp", ".shx", ".dbf", ".prj") if os.path.exists(stem + ext)]
+    return all(os.path.getmtime(cache_path) >= os.path.getmtime(src) for src in sources)
+
+
+@traced("shapefile_load")
+def _read_states(statefps):
+    """Parse the national shapefile once; statefp -> counties in PLOT_CRS."""
+    counties = gpd.read_file(SHAPEFILE_PATH)
+    states = {}
+    for statefp in statefps:
+        state = counties[counties["STATEFP"] == statefp].to_crs(PLOT_CRS)
+        state = state[COUNTY_COLUMNS].reset_index(drop=True)
+        state["County"] = state["NAME"].str.strip()
+        # representative_point is always inside the polygon (a centroid of a
+        # crescent-shaped county is not); taken from the full geometry so
+        # every level shares the same anchors
+        anchors = state.geometry.representative_point()
+        state["label_x"] = anchors.x.to_numpy()
+        state["label_y"] = anchors.y.to_numpy()
+        states[statefp] = state
+    return states
+
+
+def _write_levels(statefp, levels):
+    try:
+        os.makedirs(GEOMETRY_CACHE_DIR, exist_ok=True)
+        paths = []
+        for name, gdf in levels.items():
+            path = geometry_cache_path(statefp, name)
+            gdf.to_parquet(path)
+            paths.append(path)
+        return paths
+    except ImportError:
+        return []  # no pyarrow: keep the in-memory cache only
+
+
+def prepare_geometry(statefps=(NY_STATEFP,), levels=SIMPLIFY_LEVELS):
+    """
+    Precompute every simplification level for the given states and write
+    them to GEOMETRY_CACHE_DIR. Returns the written paths.
+    """
+    paths = []
+    for statefp, state in _read_states(list(statefps)).items():
+        paths.extend(_write_levels(statefp, simplify_levels(state, levels)))
+    return paths
+
+
+@lru_cache(maxsize=None)
+@traced("county_geometry_load")
+def state_counties(statefp=NY_STATEFP, level="full"):
+    """
+    County polygons for one state in PLOT_CRS at one simplification level,
+    with label anchors (label_x, label_y). The national shapefile is only
+    parsed when the on-disk cache is missing, older than it or written
+    before the anchors existed; that rebuild refreshes every level at once.
+    """
+    if level not in SIMPLIFY_LEVELS:
+        raise ValueError(f"level must be one of {list(SIMPLIFY_LEVELS)}, got {level!r}")
+    cache_path = geometry_cache_path(statefp, level)
+    if _cache_is_fresh(cache_path):
+        cached = gpd.read_parquet(cache_path)
+        if set(LABEL_COLUMNS) <= set(cached.columns):
+            return cached
+
+    levels = simplify_levels(_read_states([statefp])[statefp])
+    _write_levels(statefp, levels)
+    return levels[level]
+
+
+def label_anchors(statefp=NY_STATEFP):
+    """County -> (label_x, label_y) in PLOT_CRS, without any geometry."""
+    return pd.DataFrame(state_counties(statefp, "thumbnail")[["County"] + LABEL_COLUMNS]).set_index("County")
+
+
+# -------------------------------------------------------------------
+# LEVEL SELECTION
+# -------------------------------------------------------------------
+def pixel_size(bounds, figsize, dpi):
+    """Ground distance per output pixel if `bounds` filled the whole figure."""
+    width, height = bounds[2] - bounds[0], bounds[3] - bounds[1]
+    return max(width / (figsize[0] * dpi), height / (figsize[1] * dpi))
+
+
+def level_for_resolution(figsize, dpi, statefp=NY_STATEFP, pixel_tolerance=PIXEL_TOLERANCE):
+    """
+    Coarsest level whose tolerance stays within `pixel_tolerance` output
+    pixels, e.g. "fine" for an 8in figure at 300 dpi, "medium" for
+    150 dpi animation frames.
+    """
+    bounds = state_counties(statefp, "thumbnail").total_bounds
+    limit = pixel_size(bounds, figsize, dpi) * pixel_tolerance
+    fits = [name for name, tolerance in SIMPLIFY_LEVELS.items() if tolerance <= limit]
+    return max(fits, key=SIMPLIFY_LEVELS.get)
+
+
+# -------------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------------
+if __name__ == "__main__":
+    # python county_geometry.py [STATEFP ...]   (default: New York)
+    statefps = sys.argv[1:] or [NY_STATEFP]
+    for path in prepare_geometry(statefps):
+        print(f"Saved {path}")
@@ -0,0 +1,60 @@
+import sys
+
+import pandas as pd
+
+from aqi_monthly import COUNTY_DATASET
+from county_geometry import NY_STATEFP
+from lag_correlation import VIF_COLS, county_exposure_cube, county_lag_cube, cube_to_frame
+from smoke_exposure import county_exposure
+from table_store import read_dataset, read_table, write_dataset, write_table
+
+# python county_vif_correlations.py              -> New York (ny_monthly_county_aqi)
+# python county_vif_correlations.py 36 50 33     -> those states' partitions of the
+#                                                   all-states dataset (aqi_states.py)
+statefps = sys.argv[1:]
+
+# Load monthly county AQI and the merged VIF table
+if statefps:
+    county_aqi = read_dataset(COUNTY_DATASET, filters=[("STATEFP", "in", statefps)],
+                              columns=["date", "STATEFP", "County", "County_AQI"])
+else:
+    county_aqi = read_table("ny_monthly_county_aqi")
+merged_ny_vif = read_table("merged_ny_vif")
+
+# -------------------------------
+# COUNTY x REGION x LAG (0–6 months) CORRELATIONS, all at once
+# (per state, since county names repeat across states), plus each
+# county's distance-weighted exposure (smoke_exposure.py) as Region "Exposure"
+# -------------------------------
+max_lag = 6
+
+
+def state_correlations(state_aqi, statefp):
+    cube, counties, regions, lags = county_lag_cube(state_aqi, merged_ny_vif, VIF_COLS, max_lag=max_lag)
+    exposure = county_exposure(merged_ny_vif, statefp)
+    e_cube, e_counties, e_regions, _ = county_exposure_cube(state_aqi, exposure, merged_ny_vif["date"],
+                                                             max_lag=max_lag)
+    return pd.concat([cube_to_frame(cube, counties, regions, lags),
+                      cube_to_frame(e_cube, e_counties, e_regions, lags)], ignore_index=True)
+
+
+if statefps:
+    frames = [
+        state_correlations(state_aqi, statefp).assign(STATEFP=statefp)
+        for statefp, state_aqi in county_aqi.groupby("STATEFP", observed=True)
+    ]
+    county_corr = pd.concat(frames, ignore_index=True)
+else:
+    county_corr = state_correlations(county_aqi, NY_STATEFP)
+
+n_states = f"{len(statefps)} state(s), " if statefps else ""
+print(f"\n=== VIF vs county AQI: {n_states}{county_corr['County'].nunique()} counties x "
+      f"{len(VIF_COLS)} regions + exposure x {max_lag + 1} lags ===\n")
+strongest = county_corr.dropna().sort_values("r", key=abs, ascending=False)
+print(strongest.head(15).round(3).to_string(index=False))
+
+# Long table (County, Region, lag, r) for the choropleth
+if statefps:
+    write_dataset(county_corr, "county_vif_lag_correlations", ["STATEFP"])
+else:
+    write_table(county_corr, "county_vif_lag_correlations")
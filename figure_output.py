@@ -0,0 +1,26 @@
+import os
+
+from instrumentation import traced
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+DEFAULT_FORMATS = ("png",)
+DEFAULT_DPI = 300
+
+
+@traced("savefig")
+def save_figure(fig, stem, out_dir=".", formats=DEFAULT_FORMATS, dpi=DEFAULT_DPI):
+    """
+    Save `fig` as <out_dir>/<stem>.<fmt> for every format (png, svg, pdf, ...).
+    Returns the written paths.
+    """
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        path = os.path.join(out_dir, f"{stem}.{fmt.lstrip('.')}")
+        fig.savefig(path, dpi=dpi)
+        print(f"Saved {path}")
+        paths.append(path)
+    return paths
@@ -0,0 +1,216 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PatchCollection
+from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
+from matplotlib.patches import PathPatch
+from matplotlib.path import Path
+
+from instrumentation import traced
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+FRAME_STYLE = {
+    "figsize": (6, 7),
+    "dpi": 150,
+    "cmap": "YlOrRd",
+    "edgecolor": "black",
+    "linewidth": 0.25,
+    "missing_color": "lightgrey",
+    "title": "NY County AQI",
+}
+
+# "recolor": draw the county polygons once, then only swap fill colors
+# "redraw": rebuild the whole map with GeoDataFrame.plot for every frame
+RENDER_MODES = ("recolor", "redraw")
+
+# Per-worker state, set once by _init_worker
+_COUNTIES = None
+_STYLE = None
+_CANVAS = None
+
+
+# -------------------------------------------------------------------
+# FRAME DATA
+# -------------------------------------------------------------------
+def group_frames(aqi, start_year, end_year):
+    """
+    One pass over the county AQI table: mean AQI per (year-month, County).
+    Returns [(year, month, {county: aqi}), ...] in date order.
+    """
+    years = aqi["date"].dt.year
+    sub = aqi[(years >= start_year) & (years <= end_year)]
+    month = sub["date"].dt.to_period("M").rename("month")
+    means = sub.groupby([month, sub["County"].astype(str)])["County_AQI"].mean()
+
+    frames = []
+    for period, values in means.groupby(level="month"):
+        frames.append((period.year, period.month, values.droplevel("month").to_dict()))
+    return frames
+
+
+# -------------------------------------------------------------------
+# RENDERING
+# -------------------------------------------------------------------
+def _init_worker(counties, style):
+    global _COUNTIES, _STYLE, _CANVAS
+    matplotlib.use("Agg", force=True)
+    _COUNTIES = counties
+    _STYLE = style
+    _CANVAS = None
+
+
+def _geometry_path(geom):
+    """(Multi)Polygon -> one compound matplotlib Path, holes included."""
+    polygons = geom.geoms if geom.geom_type == "MultiPolygon" else [geom]
+    rings = [
+        Path(np.asarray(ring.coords)[:, :2], closed=True)
+        for polygon in polygons
+        for ring in (polygon.exterior, *polygon.interiors)
+    ]
+    return Path.make_compound_path(*rings)
+
+
+def build_canvas(counties, style):
+    """
+    Lay out the static part of a frame once: figure, axes, projection and
+    one PatchCollection holding every county outline.
+    """
+    fig = Figure(figsize=style["figsize"])
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(1, 1, 1)
+
+    patches = [PathPatch(_geometry_path(geom)) for geom in counties.geometry]
+    cmap = matplotlib.colormaps[style["cmap"]].with_extremes(bad=style["missing_color"])
+    collection = PatchCollection(
+        patches,
+        cmap=cmap,
+        norm=Normalize(),
+        edgecolor=style["edgecolor"],
+        linewidth=style["linewidth"],
+    )
+    ax.add_collection(collection)
+    ax.set_aspect("equal")
+    ax.autoscale_view()
+    title = ax.set_title("", fontsize=12)
+    ax.axis("off")
+    fig.tight_layout()
+    return {"fig": fig, "collection": collection, "title": title}
+
+
+@traced("render_frame")
+def recolor_frame(job):
+    """Reuse the worker's canvas; only the facecolors and title change."""
+    global _CANVAS
+    year, month, values, path = job
+    if _CANVAS is None:
+        _CANVAS = build_canvas(_COUNTIES, _STYLE)
+
+    aqi = _COUNTIES["County"].map(values).to_numpy(dtype=float)
+    masked = np.ma.masked_invalid(aqi)
+    collection = _CANVAS["collection"]
+    collection.set_array(masked)
+    if masked.count():
+        collection.set_clim(masked.min(), masked.max())
+    _CANVAS["title"].set_text(f"{_STYLE['title']} — {year}-{month:02d}")
+    _CANVAS["fig"].savefig(path, dpi=_STYLE["dpi"])
+    return path
+
+
+@traced("render_frame")
+def render_frame(job):
+    """Draw one month with the Agg canvas (no pyplot state) and save it."""
+    year, month, values, path = job
+    style = _STYLE
+    merged = _COUNTIES.assign(County_AQI=_COUNTIES["County"].map(values))
+
+    fig = Figure(figsize=style["figsize"])
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(1, 1, 1)
+    merged.plot(
+        ax=ax,
+        column="County_AQI",
+        cmap=style["cmap"],
+        legend=False,
+        edgecolor=style["edgecolor"],
+        linewidth=style["linewidth"],
+        missing_kwds={"color": style["missing_color"]},
+    )
+    ax.set_title(f"{style['title']} — {year}-{month:02d}", fontsize=12)
+    ax.axis("off")
+    fig.tight_layout()
+    fig.savefig(path, dpi=style["dpi"])
+    return path
+
+
+@traced("render_frames")
+def render_frames(aqi, counties, frames_dir, start_year, end_year,
+                  workers=None, style=None, prefix="ny_aqi", mode="recolor"):
+    """
+    Render every month in [start_year, end_year] to frames_dir, fanning the
+    frames out over a process pool. Returns the frame paths in date order.
+    """
+    if mode not in RENDER_MODES:
+        raise ValueError(f"mode must be one of {RENDER_MODES}, got {mode!r}")
+    render = recolor_frame if mode == "recolor" else render_frame
+    style = dict(FRAME_STYLE, **(style or {}))
+    os.makedirs(frames_dir, exist_ok=True)
+
+    jobs = [
+        (year, month, values, os.path.join(frames_dir, f"{prefix}_{year}_{month:02d}.png"))
+        for year, month, values in group_frames(aqi, start_year, end_year)
+    ]
+    if not jobs:
+        return []
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers == 1:
+        _init_worker(counties, style)
+        return [render(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(counties, style)) as pool:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        return list(pool.map(render, jobs, chunksize=chunksize))
+
+
+# -------------------------------------------------------------------
+# ENCODING
+# -------------------------------------------------------------------
+def encode_frames(frame_paths, out_path, fps=4):
+    """
+    Stitch frames into a .gif (Pillow, always available with matplotlib)
+    or .mp4 (needs the optional imageio + imageio-ffmpeg packages).
+    """
+    if not frame_paths:
+        raise ValueError("No frames to encode")
+
+    ext = os.path.splitext(out_path)[1].lower()
+    if ext == ".gif":
+        from PIL import Image
+
+        images = [Image.open(path).convert("RGB") for path in frame_paths]
+        images[0].save(
+            out_path,
+            save_all=True,
+            append_images=images[1:],
+            duration=int(1000 / fps),
+            loop=0,
+        )
+    elif ext == ".mp4":
+        try:
+            import imageio.v2 as imageio
+        except ImportError as err:
+            raise ImportError("MP4 output needs `pip install imageio imageio-ffmpeg`") from err
+
+        with imageio.get_writer(out_path, fps=fps, macro_block_size=1) as writer:
+            for path in frame_paths:
+                writer.append_data(imageio.imread(path))
+    else:
+        raise ValueError(f"Unsupported animation format: {ext} (use .gif or .mp4)")
+    return out_path
@@ -0,0 +1,259 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS
+    resource = None
+
+# -------------------------------------------------------------------
+# CONFIG (read once at import; child processes inherit the environment)
+#   PIPELINE_TRACE=trace.jsonl          turn tracing on, append records here
+#   PIPELINE_TRACE_FORMAT=json|chrome   JSON lines (default) or a Chrome
+#                                       trace (chrome://tracing, Perfetto)
+#   PIPELINE_TRACE_MEMORY=1             also track tracemalloc peaks (slower)
+# With PIPELINE_TRACE unset, span() returns a shared no-op object and
+# @traced returns the function itself, so disabled tracing costs nothing.
+# -------------------------------------------------------------------
+TRACE_PATH = os.environ.get("PIPELINE_TRACE") or None
+TRACE_FORMAT = os.environ.get("PIPELINE_TRACE_FORMAT", "json").lower()
+TRACE_MEMORY = os.environ.get("PIPELINE_TRACE_MEMORY", "") not in ("", "0")
+ENABLED = TRACE_PATH is not None
+
+if TRACE_FORMAT not in ("json", "chrome"):
+    raise ValueError(f"PIPELINE_TRACE_FORMAT must be json or chrome, got {TRACE_FORMAT!r}")
+if ENABLED and TRACE_MEMORY and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+_local = threading.local()      # per-thread stack of open spans
+_write_lock = threading.Lock()
+
+
+# -------------------------------------------------------------------
+# MEASUREMENTS
+# -------------------------------------------------------------------
+def peak_rss_mb():
+    """Process high-water RSS so far (ru_maxrss), or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def count_rows(obj):
+    """Rows of a DataFrame / Series / array (first dimension), else None."""
+    if isinstance(obj, tuple) and obj:  # (cube, labels, ...) style results
+        obj = obj[0]
+    shape = getattr(obj, "shape", None)
+    return int(shape[0]) if shape else None
+
+
+# -------------------------------------------------------------------
+# OUTPUT
+# -------------------------------------------------------------------
+def _chrome_event(record):
+    args = {k: v for k, v in record.items() if k not in ("name", "cat", "start_us", "wall_s", "pid", "tid")}
+    return {
+        "name": record["name"],
+        "cat": record["cat"],
+        "ph": "X",
+        "ts": record["start_us"],
+        "dur": round(record["wall_s"] * 1e6),
+        "pid": record["pid"],
+        "tid": record["tid"],
+        "args": args,
+    }
+
+
+def _emit(record):
+    """
+    Append one record. Every process writes whole lines in append mode, so
+    pipeline stages and their worker pools can share one trace file. The
+    Chrome format is an unterminated JSON array, which the viewers accept.
+    """
+    if TRACE_FORMAT == "chrome":
+        line = json.dumps(_chrome_event(record)) + ",\n"
+        try:
+            fd = os.open(TRACE_PATH, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+            os.write(fd, b"[\n")
+            os.close(fd)
+        except FileExistsError:
+            pass
+    else:
+        line = json.dumps(record) + "\n"
+    with _write_lock, open(TRACE_PATH, "a") as f:
+        f.write(line)
+
+
+# -------------------------------------------------------------------
+# SPANS
+# -------------------------------------------------------------------
+class _NullSpan:
+    """What span() hands out while tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed region; fields passed to set() land in the record."""
+
+    def __init__(self, name, cat, fields):
+        self.name = name
+        self.cat = cat
+        self.fields = fields
+        self.traced_peak = 0
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        stack = _local.__dict__.setdefault("stack", [])
+        if TRACE_MEMORY and tracemalloc.is_tracing():
+            # reset_peak is process-wide: hand the peak so far to the
+            # enclosing spans before restarting it for this one
+            peak = tracemalloc.get_traced_memory()[1]
+            for parent in stack:
+                parent.traced_peak = max(parent.traced_peak, peak)
+            tracemalloc.reset_peak()
+        stack.append(self)
+        self._start_us = time.time_ns() // 1000
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        stack = _local.stack
+        stack.remove(self)
+
+        record = {
+            "name": self.name,
+            "cat": self.cat,
+            "start_us": self._start_us,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        if TRACE_MEMORY and tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1]
+            self.traced_peak = max(self.traced_peak, peak)
+            for parent in stack:
+                parent.traced_peak = max(parent.traced_peak, peak)
+            record["traced_peak_mb"] = round(self.traced_peak / 2**20, 2)
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        record.update(self.fields)
+        _emit(record)
+        return False
+
+
+def span(name, cat="stage", **fields):
+    """
+    Context manager timing one region:
+
+        with span("zip_read", archive=path) as s:
+            frame = ...
+            s.set(rows_out=len(frame))
+    """
+    if not ENABLED:
+        return _NULL_SPAN
+    return Span(name, cat, fields)
+
+
+def traced(name=None, cat=None):
+    """
+    Decorator form of span(): rows_in from the first argument and rows_out
+    from the result, when they are frames or arrays.
+    """
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        label = name or fn.__qualname__
+        # scripts run directly report their file name, not "__main__"
+        category = cat or os.path.splitext(os.path.basename(fn.__code__.co_filename))[0]
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label, category, rows_in=count_rows(args[0]) if args else None) as s:
+                result = fn(*args, **kwargs)
+                s.set(rows_out=count_rows(result))
+                return result
+        return wrapper
+    return decorate
+
+
+# One record per traced process, so every pipeline stage script reports
+# its own wall/CPU time and peak RSS. Pool workers leave via os._exit and
+# don't add one.
+if ENABLED:
+    _process_span = Span(f"process:{os.path.basename(sys.argv[0]) or 'python'}", "process", {})
+    _process_span.__enter__()
+    atexit.register(_process_span.__exit__, None, None, None)
+
+
+# -------------------------------------------------------------------
+# SUMMARY
+# -------------------------------------------------------------------
+def read_trace(path):
+    """Records from a JSON-lines or Chrome trace file (Chrome args flattened back)."""
+    records = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip().rstrip(",")
+            if not line or line in ("[", "]"):
+                continue
+            event = json.loads(line)
+            if "ph" in event:
+                event = {"name": event["name"], "cat": event["cat"], "wall_s": event["dur"] / 1e6,
+                         "pid": event["pid"], **event["args"]}
+            records.append(event)
+    return records
+
+
+def summarize(records):
+    """Per span name: calls, total / max wall and CPU time, rows, peak memory."""
+    import pandas as pd
+
+    df = pd.DataFrame(records)
+    for col in ("cpu_s", "rows_in", "rows_out", "peak_rss_mb", "traced_peak_mb"):
+        if col not in df.columns:
+            df[col] = float("nan")
+    summary = df.groupby(["cat", "name"]).agg(
+        calls=("wall_s", "size"),
+        wall_s=("wall_s", "sum"),
+        max_wall_s=("wall_s", "max"),
+        cpu_s=("cpu_s", "sum"),
+        rows_in=("rows_in", lambda v: v.sum(min_count=1)),
+        rows_out=("rows_out", lambda v: v.sum(min_count=1)),
+        peak_rss_mb=("peak_rss_mb", "max"),
+        traced_peak_mb=("traced_peak_mb", "max"),
+    )
+    return summary.sort_values("wall_s", ascending=False)
+
+
+if __name__ == "__main__":
+    # python instrumentation.py trace.jsonl   -> hot spots, slowest first
+    if len(sys.argv) != 2:
+        sys.exit("usage: python instrumentation.py TRACE_FILE")
+    print(summarize(read_trace(sys.argv[1])).round(3).to_string())
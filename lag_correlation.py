@@ -0,0 +1,254 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+VIF_COLS = ["Ontario_VIF", "Quebec_VIF", "NL_VIF"]
+TARGET_COL = "NY_AQI"
+MAX_LAG = 6
+
+
+# -------------------------------------------------------------------
+# CORE KERNELS
+# -------------------------------------------------------------------
+def lag_matrix(y, lags):
+    """
+    Stack shifted copies of a series into a (n_lags, T) array (or
+    (n_series, n_lags, T) for a 2-D input): row i holds y[t + lags[i]]
+    (NaN where it runs off either end), i.e. Series.shift(-lag).
+    """
+    y = np.asarray(y, dtype=float)
+    lags = np.asarray(lags, dtype=int)
+    n = y.shape[-1]
+
+    t = np.arange(n)[None, :] + lags[:, None]
+    valid = (t >= 0) & (t < n)
+    return np.where(valid, y[..., np.clip(t, 0, n - 1)], np.nan)
+
+
+def pairwise_corr(a, b):
+    """
+    NaN-aware Pearson correlation of every row of `a` with every row of `b`.
+
+    a: (..., R, T), b: (..., L, T) -> (..., R, L). Each pair uses only the
+    time steps where both rows are finite (pairwise-complete, like
+    DataFrame.corr). Leading dimensions broadcast, so a batch of resampled
+    or shifted series is handled by the same six matrix products.
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+
+    # centring changes nothing mathematically but keeps the sums well scaled
+    with np.errstate(invalid="ignore"):
+        a = a - np.nanmean(a, axis=-1, keepdims=True)
+        b = b - np.nanmean(b, axis=-1, keepdims=True)
+
+    ma = np.isfinite(a).astype(float)
+    mb = np.isfinite(b).astype(float)
+    a0 = np.where(ma > 0, a, 0.0)
+    b0 = np.where(mb > 0, b, 0.0)
+    bt = np.swapaxes(b0, -1, -2)
+    mbt = np.swapaxes(mb, -1, -2)
+
+    n = ma @ mbt
+    sa = a0 @ mbt
+    sb = ma @ bt
+    saa = (a0 * a0) @ mbt
+    sbb = ma @ (bt * bt)
+    sab = a0 @ bt
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sab - sa * sb
+        var_a = n * saa - sa * sa
+        var_b = n * sbb - sb * sb
+        r = cov / np.sqrt(var_a * var_b)
+    r[(n < 2) | (var_a <= 0) | (var_b <= 0)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def _window_sums(v, window):
+    """Sum of every length-`window` run along the last axis, via one prefix sum."""
+    c = np.cumsum(v, axis=-1)
+    c = np.concatenate([np.zeros(c.shape[:-1] + (1,)), c], axis=-1)
+    return c[..., window:] - c[..., :-window]
+
+
+def rolling_pairwise_corr(a, b, window, min_periods=None):
+    """
+    pairwise_corr over every sliding window of `window` time steps.
+
+    a: (..., R, T), b: (..., L, T) -> (..., T - window + 1, R, L), where
+    window w covers time steps w .. w + window - 1. The running counts,
+    sums, sums of squares and cross-products come from prefix sums, so
+    each window costs O(1) whatever its length. Pairs with fewer than
+    min_periods (default: window) jointly finite steps are NaN.
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    if not 2 <= window <= a.shape[-1]:
+        raise ValueError(f"window must be between 2 and {a.shape[-1]}, got {window}")
+    min_periods = window if min_periods is None else max(min_periods, 2)
+
+    # centre on the whole series so the running sums stay well scaled
+    with np.errstate(invalid="ignore"):
+        a = a - np.nanmean(a, axis=-1, keepdims=True)
+        b = b - np.nanmean(b, axis=-1, keepdims=True)
+
+    a = a[..., :, None, :]                          # (..., R, 1, T)
+    b = b[..., None, :, :]                          # (..., 1, L, T)
+    mask = np.isfinite(a) & np.isfinite(b)          # (..., R, L, T)
+    a0 = np.where(mask, a, 0.0)
+    b0 = np.where(mask, b, 0.0)
+
+    n = _window_sums(mask.astype(float), window)
+    sa = _window_sums(a0, window)
+    sb = _window_sums(b0, window)
+    saa = _window_sums(a0 * a0, window)
+    sbb = _window_sums(b0 * b0, window)
+    sab = _window_sums(a0 * b0, window)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sab - sa * sb
+        var_a = n * saa - sa * sa
+        var_b = n * sbb - sb * sb
+        r = cov / np.sqrt(var_a * var_b)
+    # differencing prefix sums leaves rounding noise where a window is flat
+    # (e.g. a run of zero-alert months), so "no variance" is relative
+    flat = (var_a <= 1e-10 * n * saa) | (var_b <= 1e-10 * n * sbb)
+    r[(n < min_periods) | flat] = np.nan
+    return np.moveaxis(np.clip(r, -1.0, 1.0), -1, -3)
+
+
+# -------------------------------------------------------------------
+# DATAFRAME API
+# -------------------------------------------------------------------
+def lag_labels(lags):
+    return [f"lag_{lag}" for lag in lags]
+
+
+@traced("correlation")
+def lag_correlations(df, x_cols=VIF_COLS, y_col=TARGET_COL, max_lag=MAX_LAG, min_lag=0, lags=None):
+    """
+    Correlation of each x column with y shifted by every lag, in one pass.
+
+    A positive lag k pairs x at month t with y at month t + k (y lags x),
+    matching df[y_col].shift(-k); negative lags look the other way.
+    Rows must be consecutive, evenly spaced periods (e.g. one per month).
+    Returns a DataFrame indexed by x_cols with one "lag_<k>" column per lag.
+    """
+    if lags is None:
+        lags = range(min_lag, max_lag + 1)
+    lags = list(lags)
+
+    x = df[list(x_cols)].to_numpy(dtype=float).T
+    y_lagged = lag_matrix(df[y_col].to_numpy(dtype=float), lags)
+    r = pairwise_corr(x, y_lagged)
+    return pd.DataFrame(r, index=list(x_cols), columns=lag_labels(lags))
+
+
+@traced("rolling_correlation")
+def rolling_lag_correlations(df, window, x_cols=VIF_COLS, y_col=TARGET_COL, max_lag=MAX_LAG, min_lag=0,
+                             lags=None, min_periods=None, date_col="date"):
+    """
+    lag_correlations over a sliding window of `window` rows (e.g. 24 for
+    two years of months; rows may be weeks or days just as well, as long
+    as they are consecutive and evenly spaced).
+
+    Returns (surface, dates, regions, lags) with surface[w, r, l] the
+    correlation of region r's x at t with y at t + lag, over the window
+    ending at dates[w]. All windows are computed in one vectorized pass.
+    """
+    if lags is None:
+        lags = range(min_lag, max_lag + 1)
+    lags = list(lags)
+
+    df = df.sort_values(date_col)
+    x = df[list(x_cols)].to_numpy(dtype=float).T
+    y_lagged = lag_matrix(df[y_col].to_numpy(dtype=float), lags)
+    surface = rolling_pairwise_corr(x, y_lagged, window, min_periods)
+    dates = pd.DatetimeIndex(df[date_col].iloc[window - 1:], name=date_col)
+    return surface, dates, list(x_cols), lags
+
+
+def surface_to_frame(surface, dates, regions, lags):
+    """Flatten a rolling surface to a long table: date, Region, lag, r."""
+    index = pd.MultiIndex.from_product([dates, regions, lags], names=["date", "Region", "lag"])
+    return pd.DataFrame({"r": surface.ravel()}, index=index).reset_index()
+
+
+# -------------------------------------------------------------------
+# COUNTY x REGION x LAG CUBE
+# -------------------------------------------------------------------
+def county_matrix(county_aqi, dates, value_col="County_AQI"):
+    """
+    Pivot long county AQI (date, County, value) into a dense (counties, T)
+    array aligned to `dates` by calendar month; months a county never
+    reported are NaN. Month-start and month-end dates line up the same way.
+    """
+    months = pd.PeriodIndex(pd.to_datetime(dates), freq="M")
+    wide = (
+        county_aqi
+        .assign(month=county_aqi["date"].dt.to_period("M"), County=county_aqi["County"].astype(str))
+        .pivot_table(index="County", columns="month", values=value_col, aggfunc="mean")
+        .reindex(columns=months)
+    )
+    return wide.to_numpy(dtype=float), list(wide.index)
+
+
+@traced("county_correlation")
+def county_lag_cube(county_aqi, vif, x_cols=VIF_COLS, lags=None, max_lag=MAX_LAG, block_size=256):
+    """
+    Lagged correlation of every VIF column against every county's AQI.
+
+    county_aqi: long table (date, County, County_AQI)
+    vif:        monthly table with a date column and the x_cols
+    Returns (cube, counties, regions, lags) with cube[c, r, l] the
+    correlation of region r's VIF at month t with county c's AQI at t + lag.
+    Counties are processed in blocks so the stacked lag matrix stays small
+    however many counties there are.
+    """
+    if lags is None:
+        lags = range(0, max_lag + 1)
+    lags = list(lags)
+
+    vif = vif.sort_values("date")
+    x = vif[list(x_cols)].to_numpy(dtype=float).T
+    y, counties = county_matrix(county_aqi, vif["date"])
+
+    cube = np.empty((len(counties), len(x_cols), len(lags)))
+    for start in range(0, len(counties), block_size):
+        block = y[start:start + block_size]
+        stacked = lag_matrix(block, lags).reshape(-1, y.shape[1])  # (block * lags, T)
+        r = pairwise_corr(x, stacked).reshape(len(x_cols), len(block), len(lags))
+        cube[start:start + len(block)] = r.transpose(1, 0, 2)
+    return cube, counties, list(x_cols), lags
+
+
+@traced("exposure_correlation")
+def county_exposure_cube(county_aqi, exposure, dates, lags=None, max_lag=MAX_LAG, value_col="Exposure"):
+    """
+    Lagged correlation of every county's own exposure series (long table:
+    date, County, value_col) with that county's AQI, on the months in
+    `dates`. Returns (cube, counties, ["Exposure"], lags) shaped like
+    county_lag_cube, so cube_to_frame and the county maps take it as is.
+    """
+    if lags is None:
+        lags = range(0, max_lag + 1)
+    lags = list(lags)
+
+    y, counties = county_matrix(county_aqi, dates)
+    x, x_counties = county_matrix(exposure, dates, value_col)
+    x = pd.DataFrame(x, index=x_counties).reindex(counties).to_numpy()
+
+    # batch over counties: (C, 1, T) against (C, lags, T) -> (C, 1, lags)
+    cube = pairwise_corr(x[:, None, :], lag_matrix(y, lags))
+    return cube, counties, [value_col], lags
+
+
+def cube_to_frame(cube, counties, regions, lags):
+    """Flatten the cube to a long table: County, Region, lag, r."""
+    index = pd.MultiIndex.from_product([counties, regions, lags], names=["County", "Region", "lag"])
+    return pd.DataFrame({"r": cube.ravel()}, index=index).reset_index()
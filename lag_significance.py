@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+from lag_correlation import MAX_LAG, TARGET_COL, VIF_COLS, lag_matrix, pairwise_corr
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+N_PERMUTATIONS = 5000
+N_BOOTSTRAP = 5000
+BLOCK_LENGTH = 12     # months per bootstrap block (keeps a fire season intact)
+MIN_SHIFT = 12        # circular shifts closer than this to 0 are not "null"
+CHUNK_SIZE = 500      # resamples per task; fixes the RNG streams, not the workers
+# workers=None runs in-process (the defaults take well under a second) and
+# only starts a process pool from this many resamples (permutation + bootstrap)
+PARALLEL_MIN_RESAMPLES = 100_000
+SEED = 0
+
+
+# -------------------------------------------------------------------
+# RESAMPLING KERNELS (one chunk of resamples each)
+# -------------------------------------------------------------------
+def _circular_shift_chunk(x, y_lagged, n, min_shift, seed):
+    """
+    Null distribution: rotate every VIF series by a random offset, which
+    keeps its autocorrelation but breaks its alignment with AQI.
+    Returns (n, regions, lags).
+    """
+    rng = np.random.default_rng(seed)
+    T = x.shape[-1]
+    offsets = rng.integers(min_shift, T - min_shift + 1, size=n)
+    idx = (np.arange(T)[None, :] + offsets[:, None]) % T
+    shifted = x[:, idx].transpose(1, 0, 2)  # (n, R, T)
+    return pairwise_corr(shifted, y_lagged)
+
+
+def _block_bootstrap_chunk(x, y_lagged, n, block_length, seed):
+    """
+    Moving-block bootstrap of the (VIF, lagged AQI) pairs: whole blocks of
+    consecutive months are resampled so short-range dependence survives.
+    Returns (n, regions, lags).
+    """
+    rng = np.random.default_rng(seed)
+    T = x.shape[-1]
+    block_length = min(block_length, T)
+    n_blocks = -(-T // block_length)
+    starts = rng.integers(0, T - block_length + 1, size=(n, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_length)).reshape(n, -1)[:, :T]
+    xb = x[:, idx].transpose(1, 0, 2)          # (n, R, T)
+    yb = y_lagged[:, idx].transpose(1, 0, 2)   # (n, L, T)
+    return pairwise_corr(xb, yb)
+
+
+def _run_chunk(job):
+    kind, x, y_lagged, n, param, seed = job
+    if kind == "permutation":
+        return _circular_shift_chunk(x, y_lagged, n, param, seed)
+    return _block_bootstrap_chunk(x, y_lagged, n, param, seed)
+
+
+def _resample(kind, x, y_lagged, n_total, param, seed_seq, executor):
+    sizes = [CHUNK_SIZE] * (n_total // CHUNK_SIZE)
+    if n_total % CHUNK_SIZE:
+        sizes.append(n_total % CHUNK_SIZE)
+    seeds = seed_seq.spawn(len(sizes))
+    jobs = [(kind, x, y_lagged, n, param, s) for n, s in zip(sizes, seeds)]
+
+    results = executor.map(_run_chunk, jobs) if executor is not None else map(_run_chunk, jobs)
+    return np.concatenate(list(results), axis=0)
+
+
+# -------------------------------------------------------------------
+# SIGNIFICANCE TABLE
+# -------------------------------------------------------------------
+@traced("significance")
+def lag_significance(df, x_cols=VIF_COLS, y_col=TARGET_COL, max_lag=MAX_LAG, min_lag=0, lags=None,
+                     n_permutations=N_PERMUTATIONS, n_bootstrap=N_BOOTSTRAP,
+                     block_length=BLOCK_LENGTH, min_shift=MIN_SHIFT,
+                     alpha=0.05, seed=SEED, workers=None):
+    """
+    Observed lag correlations plus, for every region x lag:
+      p_perm           two-sided circular-shift permutation p-value
+      ci_low, ci_high  (1 - alpha) moving-block bootstrap percentile interval
+
+    Resamples are split into fixed-size chunks, each with its own child of
+    SeedSequence(seed), so a given seed gives the same table whether the
+    chunks run serially or across a process pool (workers > 1). With
+    workers=None the pool is only used from PARALLEL_MIN_RESAMPLES
+    resamples, with one worker per CPU.
+    """
+    if lags is None:
+        lags = range(min_lag, max_lag + 1)
+    lags = list(lags)
+
+    x = df[list(x_cols)].to_numpy(dtype=float).T
+    y_lagged = lag_matrix(df[y_col].to_numpy(dtype=float), lags)
+    observed = pairwise_corr(x, y_lagged)
+
+    if x.shape[-1] < 2 * min_shift + 1:
+        raise ValueError(f"Need at least {2 * min_shift + 1} rows for min_shift={min_shift}")
+
+    perm_seq, boot_seq = np.random.SeedSequence(seed).spawn(2)
+    if workers is None:
+        large = n_permutations + n_bootstrap >= PARALLEL_MIN_RESAMPLES
+        workers = (os.cpu_count() or 1) if large else 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        null = _resample("permutation", x, y_lagged, n_permutations, min_shift, perm_seq, executor)
+        boot = _resample("bootstrap", x, y_lagged, n_bootstrap, block_length, boot_seq, executor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    exceed = (np.abs(null) >= np.abs(observed)[None] - 1e-12).sum(axis=0)
+    p_perm = np.where(np.isnan(observed), np.nan, (exceed + 1) / (n_permutations + 1))
+    with np.errstate(invalid="ignore"):
+        ci_low, ci_high = np.nanquantile(boot, [alpha / 2, 1 - alpha / 2], axis=0)
+
+    index = pd.MultiIndex.from_product([list(x_cols), lags], names=["Region", "lag"])
+    return pd.DataFrame(
+        {
+            "r": observed.ravel(),
+            "p_perm": p_perm.ravel(),
+            "ci_low": ci_low.ravel(),
+            "ci_high": ci_high.ravel(),
+        },
+        index=index,
+    ).reset_index()
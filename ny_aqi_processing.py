@@ -1,56 +1,19 @@
-import pandas as pd
-
-# Load your filtered NY data
-aqi = pd.read_csv("aqi_daily_1980_to_2021_New_York.csv")
-
-# Convert Date to datetime
-aqi["Date"] = pd.to_datetime(aqi["Date"])
-
-# Limit to 2010–2021
-aqi = aqi[(aqi["Date"] >= "2010-01-01") & (aqi["Date"] <= "2021-12-31")]
-
-# --- 1. Monthly AQI per county ----------------------------------------------
-# Group by county + month, compute mean AQI
-monthly_county = (
-    aqi
-    .set_index("Date")
-    .groupby("County Name")["AQI"]
-    .resample("MS")
-    .mean()
-    .reset_index()
-    .rename(columns={"AQI": "County_AQI", "Date": "date"})
-)
-
-# --- 2. Monthly statewide NY AQI (mean across all counties) -----------------
-monthly_statewide = (
-    aqi
-    .set_index("Date")
-    .resample("MS")["AQI"]
-    .mean()
-    .reset_index()
-    .rename(columns={"AQI": "NY_AQI", "Date": "date"})
+from aqi_monthly import aggregate_daily_aqi
+from table_store import write_table
+
+# Stream your filtered NY data in chunks, limited to 2010–2021.
+# Only the per county-month sums/counts are kept in memory.
+aggregator = aggregate_daily_aqi(
+    "aqi_daily_1980_to_2021_New_York.csv",
+    start="2010-01-01",
+    end="2021-12-31",
 )
 
 # ---------- Monthly AQI per county ----------
-monthly_county = (
-    aqi
-    .set_index("Date")
-    .groupby("County Name")["AQI"]
-    .resample("MS")
-    .mean()
-    .reset_index()
-    .rename(columns={"AQI": "County_AQI", "Date": "date"})
-)
+monthly_county = aggregator.county_monthly()
 
 # ---------- Monthly statewide AQI ----------
-monthly_statewide = (
-    aqi
-    .set_index("Date")
-    .resample("MS")["AQI"]
-    .mean()
-    .reset_index()
-    .rename(columns={"AQI": "NY_AQI", "Date": "date"})
-)
+monthly_statewide = aggregator.statewide_monthly("NY_AQI")
 
 print("\nMonthly County-Level AQI:")
 print(monthly_county.head(20))
@@ -64,4 +27,4 @@ print(monthly_county.info())
 print("\nStatewide structure:")
 print(monthly_statewide.info())
 
-monthly_statewide.to_csv("monthly_statewide.csv", index=False)
\ No newline at end of file
+write_table(monthly_statewide, "monthly_statewide")
@@ -1,31 +1,20 @@
-import pandas as pd
+from aqi_monthly import PARTIALS_TABLE, aggregate_daily_aqi
+from table_store import write_table
 
-# Load your full AQI dataset (use the daily 1980–2021 one you filtered)
-df = pd.read_csv("aqi_daily_1980_to_2021_New_York.csv", parse_dates=["Date"])
-
-# Ensure column names are consistent
-df = df.rename(columns={
-    "County Name": "County",
-    "Date": "date",
-    "AQI": "AQI"
-})
-
-# Filter only New York (safety check)
-df = df[df["State Name"] == "New York"]
-
-# Monthly average AQI per county
-monthly_county = (
-    df.groupby([pd.Grouper(key="date", freq="M"), "County"])["AQI"]
-      .mean()
-      .reset_index()
-      .rename(columns={"AQI": "County_AQI"})
+# Stream your full AQI dataset (use the daily 1980–2021 one you filtered),
+# keeping only New York rows (safety check) as each chunk is read
+aggregator = aggregate_daily_aqi(
+    "aqi_daily_1980_to_2021_New_York.csv",
+    state="New York",
 )
 
-# Sort for readability
-monthly_county = monthly_county.sort_values(["County", "date"])
+# Monthly average AQI per county (month-start dates, sorted by County, date)
+monthly_county = aggregator.county_monthly()
 
-# Save output
-monthly_county.to_csv("ny_monthly_county_aqi.csv", index=False)
+# Save output, plus the mergeable partials (sum/count/min/max per
+# county-month) so new daily data can be appended with aqi_append.py
+write_table(monthly_county, "ny_monthly_county_aqi")
+write_table(aggregator.partials(), PARTIALS_TABLE)
 
-print("Created ny_monthly_county_aqi.csv")
+print("Created ny_monthly_county_aqi")
 print(monthly_county.head(10))
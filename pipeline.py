@@ -0,0 +1,354 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from instrumentation import span
+from table_store import csv_path, table_path
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+PIPELINE_DIR = ".pipeline"
+CACHE_PATH = os.path.join(PIPELINE_DIR, "cache.json")
+LOG_DIR = os.path.join(PIPELINE_DIR, "logs")
+
+DAILY_AQI_CSV = "aqi_daily_1980_to_2021_New_York.csv"
+SHAPEFILE_PATH = "shapefiles/cb_2018_us_county_5m/cb_2018_us_county_5m.shp"
+# county_geometry.py writes one NY parquet per simplification level
+GEOMETRY_CACHE = [f"cache/counties_36_{level}.parquet" for level in ("full", "fine", "medium", "coarse", "thumbnail")]
+
+
+@dataclass
+class Stage:
+    """
+    One existing script plus what it reads and writes.
+    `inputs` / `outputs` are plain files, `tables_in` / `tables_out` are
+    table_store names (resolved to store/<name>.feather or <name>.csv).
+    """
+    name: str
+    script: str
+    inputs: list = field(default_factory=list)
+    outputs: list = field(default_factory=list)
+    tables_in: list = field(default_factory=list)
+    tables_out: list = field(default_factory=list)
+
+
+def _alerts(region):
+    return f"Historical Fire Alerts in {region}, Canada.zip"
+
+
+# vif_ingest.py decodes every fire-alert archive into monthly_vif, which is
+# what vif_aqi_merge reads, so the per-province vif_*_processing.py wrappers
+# are not stages (running them too would decode each archive twice).
+STAGES = [
+    Stage("vif_ingest", "vif_ingest.py",
+          inputs=[_alerts("Ontario"), _alerts("Québec"), _alerts("Newfoundland and Labrador")],
+          tables_out=["monthly_vif"]),
+    Stage("tree_cover_loss", "tree_cover_loss_ingest.py",
+          inputs=[f"Tree cover loss by dominant driver in {region}, Canada.zip"
+                  for region in ("Ontario", "Québec", "Newfoundland and Labrador")],
+          tables_out=["tree_cover_loss"]),
+    Stage("ny_aqi", "ny_aqi_processing.py",
+          inputs=[DAILY_AQI_CSV], tables_out=["monthly_statewide"]),
+    Stage("ny_county_aqi", "ny_county_aqi.py",
+          inputs=[DAILY_AQI_CSV], tables_out=["ny_monthly_county_aqi", "ny_county_aqi_partials"]),
+    Stage("vif_aqi_merge", "vif_aqi_merge.py",
+          tables_in=["monthly_vif", "monthly_statewide"],
+          tables_out=["merged_ny_vif"]),
+    Stage("vif_correlations", "vif_correlations.py",
+          tables_in=["merged_ny_vif"], tables_out=["rolling_lag_correlations"]),
+    Stage("vif_correlation_barchart", "vif_correlation_barchart.py",
+          tables_in=["merged_ny_vif"], outputs=["correlation_barchart.png"]),
+    Stage("plots", "plots.py",
+          tables_in=["merged_ny_vif"], outputs=["vif_vs_aqi_logscale_plot.png"]),
+    Stage("county_geometry", "county_geometry.py",
+          inputs=[SHAPEFILE_PATH], outputs=GEOMETRY_CACHE),
+    Stage("smoke_exposure", "smoke_exposure.py",
+          inputs=GEOMETRY_CACHE,
+          tables_in=["merged_ny_vif"],
+          tables_out=["county_region_weights", "county_smoke_exposure"]),
+    Stage("county_vif_correlations", "county_vif_correlations.py",
+          tables_in=["ny_monthly_county_aqi", "merged_ny_vif", "county_region_weights"],
+          tables_out=["county_vif_lag_correlations"]),
+    Stage("county_aqi_choroplethmap", "county_aqi_choroplethmap.py",
+          inputs=GEOMETRY_CACHE,
+          tables_in=["ny_monthly_county_aqi", "merged_ny_vif", "county_region_weights"],
+          outputs=["ny_county_aqi_Average_AQI_2020.png",
+                   "ny_upstate_downstate_aqi.png",
+                   "ny_map_vif_panel_Avg_2020.png",
+                   "ny_smoke_exposure_Average_2020.png"]),
+]
+
+
+# -------------------------------------------------------------------
+# FINGERPRINTS
+# -------------------------------------------------------------------
+def _resolve_table(name):
+    stored = table_path(name)
+    return stored if os.path.exists(stored) else csv_path(name)
+
+
+def _shapefile_parts(path):
+    """A .shp is useless without its sidecars, so hash them together."""
+    stem, ext = os.path.splitext(path)
+    if ext.lower() != ".shp":
+        return [path]
+    return [stem + side for side in (".shp", ".shx", ".dbf", ".prj", ".cpg") if os.path.exists(stem + side)]
+
+
+def file_digest(path, hashes):
+    """
+    sha256 of a file, reusing the previous digest while size and mtime are
+    unchanged so large inputs are only re-read when they actually change.
+    """
+    st = os.stat(path)
+    key = [st.st_size, st.st_mtime_ns]
+    cached = hashes.get(path)
+    if cached and cached["stat"] == key:
+        return cached["sha256"]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    hashes[path] = {"stat": key, "sha256": h.hexdigest()}
+    return hashes[path]["sha256"]
+
+
+def local_modules(script, seen=None):
+    """The script plus every repo-local module it (transitively) imports."""
+    seen = set() if seen is None else seen
+    if script in seen or not os.path.exists(script):
+        return seen
+    seen.add(script)
+
+    with open(script, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=script)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            local_modules(name.split(".")[0] + ".py", seen)
+    return seen
+
+
+def stage_input_files(stage):
+    files = []
+    for path in stage.inputs:
+        files.extend(_shapefile_parts(path))
+    files.extend(_resolve_table(name) for name in stage.tables_in)
+    return files
+
+
+def stage_output_files(stage):
+    return list(stage.outputs) + [_resolve_table(name) for name in stage.tables_out]
+
+
+def needed_output_files(stage, stages):
+    """
+    Outputs some other stage reads (all outputs for a terminal stage): the
+    ones that must already exist to skip a stage whose inputs are missing.
+    """
+    consumed = {item for other in stages for item in other.tables_in + other.inputs}
+    tables = [name for name in stage.tables_out if name in consumed]
+    files = [path for path in stage.outputs if path in consumed]
+    if not tables and not files:
+        return stage_output_files(stage)
+    return files + [_resolve_table(name) for name in tables]
+
+
+def fingerprint(stage, hashes):
+    h = hashlib.sha256(stage.script.encode())
+    for path in sorted(local_modules(stage.script)) + stage_input_files(stage):
+        h.update(path.encode())
+        h.update(file_digest(path, hashes).encode())
+    return h.hexdigest()
+
+
+# -------------------------------------------------------------------
+# DAG
+# -------------------------------------------------------------------
+def dependencies(stages):
+    """stage name -> set of upstream stage names (by produced tables/files)."""
+    producers = {}
+    for stage in stages:
+        for product in stage.tables_out + stage.outputs:
+            producers[product] = stage.name
+    return {
+        stage.name: {
+            producers[item]
+            for item in stage.tables_in + stage.inputs
+            if item in producers and producers[item] != stage.name
+        }
+        for stage in stages
+    }
+
+
+def select_stages(stages, targets):
+    """Targets plus everything upstream of them, in definition order."""
+    if not targets:
+        return list(stages)
+    by_name = {stage.name: stage for stage in stages}
+    unknown = set(targets) - set(by_name)
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+
+    deps = dependencies(stages)
+    wanted, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in wanted:
+            wanted.add(name)
+            todo.extend(deps[name])
+    return [stage for stage in stages if stage.name in wanted]
+
+
+# -------------------------------------------------------------------
+# RUNNER
+# -------------------------------------------------------------------
+def load_cache():
+    if not os.path.exists(CACHE_PATH):
+        return {"stages": {}, "hashes": {}}
+    with open(CACHE_PATH) as f:
+        return json.load(f)
+
+
+def save_cache(cache):
+    os.makedirs(PIPELINE_DIR, exist_ok=True)
+    tmp = CACHE_PATH + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp, CACHE_PATH)
+
+
+def run_script(stage):
+    """Run a stage script in its own interpreter with a non-blocking backend."""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{stage.name}.log")
+    env = dict(os.environ, MPLBACKEND="Agg")
+    # the child inherits PIPELINE_TRACE*, so its own spans land in the same trace
+    with span(f"stage:{stage.name}", "pipeline", script=stage.script) as s, open(log_path, "w") as log:
+        proc = subprocess.run([sys.executable, stage.script], stdout=log, stderr=subprocess.STDOUT, env=env)
+        s.set(returncode=proc.returncode)
+    return proc.returncode, log_path
+
+
+def run_pipeline(targets=None, force=False, jobs=None, dry_run=False):
+    stages = select_stages(STAGES, targets)
+    deps = dependencies(stages)
+    cache = load_cache()
+    hashes = cache["hashes"]
+
+    pending = {stage.name: stage for stage in stages}
+    # a dry run never creates these, so they cannot count as missing inputs
+    upstream_files = {path for stage in stages for path in stage.outputs}
+    done, failed, rerun = set(), set(), set()
+
+    def ready():
+        return [
+            stage for stage in pending.values()
+            if deps[stage.name] <= done and not deps[stage.name] & failed
+        ]
+
+    def plan(stage):
+        """
+        Return a fingerprint if the stage must run, None to skip it. A
+        stage whose inputs are missing (and cannot be skipped) is marked
+        failed, so its dependents are blocked and the rest still runs.
+        """
+        missing = [
+            path for path in stage.inputs
+            if not os.path.exists(path) and not (dry_run and path in upstream_files)
+        ]
+        outputs_exist = all(os.path.exists(path) for path in stage_output_files(stage))
+        if missing:
+            if all(os.path.exists(path) for path in needed_output_files(stage, STAGES)):
+                print(f"[skip] {stage.name}: missing {', '.join(missing)}, using existing outputs")
+                return None
+            failed.add(stage.name)
+            print(f"[fail] {stage.name}: missing inputs {', '.join(missing)}")
+            return None
+
+        # upstream outputs only exist after a real run, so a dry run has to
+        # assume anything downstream of a would-run stage changes too
+        if dry_run and deps[stage.name] & rerun:
+            return "dry-run"
+        fp = fingerprint(stage, hashes)
+        if not force and outputs_exist and cache["stages"].get(stage.name) == fp:
+            print(f"[skip] {stage.name}: unchanged")
+            return None
+        return fp
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        running = {}
+        while pending or running:
+            for stage in ready():
+                del pending[stage.name]
+                fp = plan(stage)
+                if stage.name in failed:
+                    continue
+                if fp is None:
+                    done.add(stage.name)
+                elif dry_run:
+                    print(f"[would run] {stage.name}")
+                    rerun.add(stage.name)
+                    done.add(stage.name)
+                else:
+                    print(f"[run] {stage.name}")
+                    running[pool.submit(run_script, stage)] = (stage, fp)
+
+            if not running:
+                if pending and not ready():
+                    # everything left is downstream of a failure
+                    for name in pending:
+                        print(f"[blocked] {name}")
+                    break
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, fp = running.pop(future)
+                returncode, log_path = future.result()
+                if returncode == 0:
+                    cache["stages"][stage.name] = fp
+                    rerun.add(stage.name)
+                    done.add(stage.name)
+                    print(f"[done] {stage.name}")
+                else:
+                    failed.add(stage.name)
+                    print(f"[fail] {stage.name} (exit {returncode}), see {log_path}")
+            save_cache(cache)
+
+    save_cache(cache)
+    return not failed
+
+
+# -------------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the VIF / AQI pipeline, skipping unchanged stages.")
+    parser.add_argument("stages", nargs="*", help="stages to bring up to date (default: all)")
+    parser.add_argument("--force", action="store_true", help="rerun selected stages even if unchanged")
+    parser.add_argument("--jobs", type=int, default=None, help="max stages to run at once")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would run")
+    parser.add_argument("--list", action="store_true", help="list stages and their dependencies")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, upstream in dependencies(STAGES).items():
+            print(f"{name}: {', '.join(sorted(upstream)) or '-'}")
+        sys.exit(0)
+
+    ok = run_pipeline(args.stages, force=args.force, jobs=args.jobs, dry_run=args.dry_run)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,279 @@
+import argparse
+import json
+import math
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from lag_correlation import county_lag_cube, lag_correlations
+from table_store import read_table
+from vif_ingest import align_regions, read_monthly_vif, vif_column
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+HOST = "127.0.0.1"
+PORT = 8765
+CACHE_SIZE = 512                        # repeated map / correlation queries
+MAX_LAG = 6
+AGGREGATES = ("mean", "min", "max", "sum", "count")
+
+COUNTY_AQI_TABLE = "ny_monthly_county_aqi"
+STATEWIDE_TABLE = "monthly_statewide"
+MERGED_VIF_TABLE = "merged_ny_vif"
+
+# Endpoints (GET, JSON out; dates as YYYY-MM or YYYY-MM-DD, both inclusive):
+#   /counties
+#   /county?name=Suffolk&start=2015-01&end=2020-12[&agg=mean]
+#   /statewide?start=...&end=...[&agg=max]
+#   /region?name=Ontario&start=...&end=...[&agg=sum]
+#   /map?year=2020[&month=7]                     county -> mean AQI
+#   /lag_correlation?region=Ontario[&county=Suffolk][&start&end][&max_lag=6]
+#   /stats                                       cache hit rates
+# Without agg, range queries return the monthly series.
+
+
+# -------------------------------------------------------------------
+# HELPERS
+# -------------------------------------------------------------------
+def _month(value, name):
+    """'2020-07' / '2020-07-15' -> Period('2020-07'); None passes through."""
+    if value is None:
+        return None
+    try:
+        return pd.Period(value, freq="M")
+    except ValueError:
+        raise ValueError(f"{name} must be a date like 2020-07, got {value!r}") from None
+
+
+def _monthly(series):
+    """Re-index a date-indexed series by month (Period) for exact, sorted lookups."""
+    series = series.copy()
+    series.index = pd.PeriodIndex(series.index, freq="M", name="month")
+    return series.sort_index()
+
+
+def _clean(value):
+    """JSON-safe scalar: NaN -> None, numpy -> Python."""
+    if value is None:
+        return None
+    value = value.item() if hasattr(value, "item") else value
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+def _series_json(series):
+    return [{"month": str(month), "value": _clean(value)} for month, value in series.items()]
+
+
+# -------------------------------------------------------------------
+# IN-MEMORY STORE
+# -------------------------------------------------------------------
+class QueryStore:
+    """
+    The pipeline tables, loaded once and indexed by month:
+      county_aqi     months x counties (wide, so a map is one row slice)
+      statewide_aqi  NY_AQI by month
+      vif            months x regions from read_monthly_vif, columns named
+                     like merged_ny_vif
+      merged         merged_ny_vif by month, for the correlation queries
+    Query methods are wrapped in per-store LRU caches; every argument is
+    a canonical string or number so equal queries share a cache entry.
+    """
+
+    def __init__(self, cache_size=CACHE_SIZE):
+        county = read_table(COUNTY_AQI_TABLE)
+        county = county.assign(County=county["County"].astype(str).str.strip())
+        self.county_long = county
+        self.county_aqi = county.pivot_table(index="date", columns="County", values="County_AQI", aggfunc="mean")
+        self.county_aqi.index = pd.PeriodIndex(self.county_aqi.index, freq="M", name="month")
+        self.county_aqi = self.county_aqi.sort_index()
+
+        self.statewide_aqi = _monthly(read_table(STATEWIDE_TABLE).set_index("date")["NY_AQI"])
+
+        self.merged = read_table(MERGED_VIF_TABLE).sort_values("date").reset_index(drop=True)
+
+        try:
+            self.vif = align_regions(read_monthly_vif())
+        except FileNotFoundError:
+            # no long VIF table at all: the merged months carry every *_VIF column
+            self.vif = self.merged.set_index("date").filter(regex="_VIF$")
+        self.vif.index = pd.PeriodIndex(self.vif.index, freq="M", name="month")
+
+        for name in ("county", "statewide", "region", "county_map", "lag_correlation"):
+            setattr(self, name, lru_cache(maxsize=cache_size)(getattr(self, f"_{name}")))
+
+    # ---- lookups ----
+    def counties(self):
+        return list(self.county_aqi.columns)
+
+    def regions(self):
+        return list(self.vif.columns)
+
+    def _region_column(self, name):
+        """Accept 'Ontario', 'Newfoundland and Labrador' or 'NL_VIF'."""
+        column = name if name in self.vif.columns else vif_column(name)
+        if column not in self.vif.columns:
+            raise LookupError(f"Unknown region {name!r}; known: {', '.join(self.regions())}")
+        return column
+
+    @staticmethod
+    def _range(series, start, end, agg):
+        selected = series.loc[_month(start, "start"):_month(end, "end")]
+        if agg is None:
+            return {"series": _series_json(selected)}
+        if agg not in AGGREGATES:
+            raise ValueError(f"agg must be one of {', '.join(AGGREGATES)}, got {agg!r}")
+        return {"agg": agg, "value": _clean(getattr(selected, agg)()), "months": int(selected.notna().sum())}
+
+    # ---- queries (cached) ----
+    def _county(self, name, start=None, end=None, agg=None):
+        if name not in self.county_aqi.columns:
+            raise LookupError(f"Unknown county {name!r}")
+        return {"county": name, **self._range(self.county_aqi[name].dropna(), start, end, agg)}
+
+    def _statewide(self, start=None, end=None, agg=None):
+        return {"series_name": "NY_AQI", **self._range(self.statewide_aqi, start, end, agg)}
+
+    def _region(self, name, start=None, end=None, agg=None):
+        column = self._region_column(name)
+        return {"region": column, **self._range(self.vif[column].dropna(), start, end, agg)}
+
+    def _county_map(self, year, month=None):
+        """County -> mean AQI over one year, or one month of it."""
+        rows = self.county_aqi[self.county_aqi.index.year == year]
+        if month is not None:
+            rows = rows[rows.index.month == month]
+        values = rows.mean()
+        return {"year": year, "month": month, "values": {county: _clean(v) for county, v in values.items()}}
+
+    def _lag_correlation(self, region, county=None, start=None, end=None, max_lag=MAX_LAG):
+        """
+        Correlation of a region's VIF with NY AQI (or one county's AQI)
+        `lag` months later, over the merged months between start and end.
+        """
+        column = self._region_column(region)
+        months = pd.PeriodIndex(self.merged["date"], freq="M")
+        start, end = _month(start, "start"), _month(end, "end")
+        merged = self.merged[(months >= (start or months.min())) & (months <= (end or months.max()))]
+        if county is None:
+            r = lag_correlations(merged, [column], "NY_AQI", max_lag=max_lag).iloc[0].to_numpy()
+        else:
+            if county not in self.county_aqi.columns:
+                raise LookupError(f"Unknown county {county!r}")
+            county_aqi = self.county_long[self.county_long["County"] == county]
+            cube, _, _, _ = county_lag_cube(county_aqi, merged, [column], max_lag=max_lag)
+            r = cube[0, 0]
+        return {
+            "region": column,
+            "county": county,
+            "months": len(merged),
+            "lags": {str(lag): _clean(value) for lag, value in zip(range(max_lag + 1), r)},
+        }
+
+    def cache_stats(self):
+        stats = {}
+        for name in ("county", "statewide", "region", "county_map", "lag_correlation"):
+            info = getattr(self, name).cache_info()
+            stats[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+        return stats
+
+
+# -------------------------------------------------------------------
+# HTTP
+# -------------------------------------------------------------------
+def _required(params, name):
+    if name not in params:
+        raise ValueError(f"Missing parameter {name!r}")
+    return params[name]
+
+
+def _int(params, name, default=None):
+    value = params.get(name, default)
+    try:
+        return None if value is None else int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}") from None
+
+
+def route(store, path, params):
+    """(status, payload) for one GET request; params maps name -> single value."""
+    # canonical YYYY-MM strings, so 2020-07 and 2020-07-15 share a cache entry
+    dates = tuple(None if params.get(name) is None else str(_month(params[name], name)) for name in ("start", "end"))
+    if path == "/counties":
+        return 200, {"counties": store.counties()}
+    if path == "/county":
+        return 200, store.county(_required(params, "name"), *dates, params.get("agg"))
+    if path == "/statewide":
+        return 200, store.statewide(*dates, params.get("agg"))
+    if path == "/region":
+        return 200, store.region(_required(params, "name"), *dates, params.get("agg"))
+    if path == "/map":
+        return 200, store.county_map(_int(params, "year", _required(params, "year")), _int(params, "month"))
+    if path == "/lag_correlation":
+        max_lag = _int(params, "max_lag", MAX_LAG)
+        if not 0 <= max_lag <= 24:
+            raise ValueError(f"max_lag must be between 0 and 24, got {max_lag}")
+        return 200, store.lag_correlation(_required(params, "region"), params.get("county"), *dates, max_lag)
+    if path == "/stats":
+        return 200, store.cache_stats()
+    return 404, {"error": f"Unknown endpoint {path}"}
+
+
+def make_handler(store):
+    class QueryHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            t0 = time.perf_counter()
+            try:
+                status, payload = route(store, url.path.rstrip("/") or "/", params)
+            except LookupError as exc:
+                status, payload = 404, {"error": exc.args[0]}
+            except ValueError as exc:
+                status, payload = 400, {"error": str(exc)}
+            except Exception as exc:  # keep serving; report instead of dropping the connection
+                status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+            # cached payloads are shared: add the timing to a copy
+            payload = {**payload, "elapsed_ms": round((time.perf_counter() - t0) * 1000, 3)}
+
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass  # keep the console for the startup banner
+
+    return QueryHandler
+
+
+def serve(host=HOST, port=PORT, cache_size=CACHE_SIZE):
+    t0 = time.perf_counter()
+    store = QueryStore(cache_size)
+    server = ThreadingHTTPServer((host, port), make_handler(store))
+    print(f"Loaded {len(store.counties())} counties, {len(store.regions())} regions "
+          f"in {time.perf_counter() - t0:.2f}s; serving on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# -------------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local JSON queries over the monthly AQI and VIF tables.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.cache_size)
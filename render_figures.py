@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+matplotlib.use("Agg")  # headless before anything imports pyplot
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+OUT_DIR = "figures"
+MANIFEST_NAME = "manifest.json"
+
+# name -> (module, function, "fig" if it returns a figure to save,
+#          "paths" if it saves itself and returns the written paths)
+FIGURES = {
+    "vif_vs_aqi_log": ("plots", "plot_vif_vs_aqi_log", "fig"),
+    "correlation_barchart": ("vif_correlation_barchart", "plot_correlation_barchart", "fig"),
+    "static_map": ("county_aqi_choroplethmap", "plot_static_map", "paths"),
+    "regional_averages": ("county_aqi_choroplethmap", "plot_regional_averages", "paths"),
+    "map_vif_panel": ("county_aqi_choroplethmap", "plot_map_with_vif_panel", "paths"),
+    "smoke_exposure": ("county_aqi_choroplethmap", "plot_smoke_exposure", "paths"),
+}
+
+# file stems for figures that return a figure instead of saving it
+FIGURE_STEMS = {
+    "vif_vs_aqi_log": "vif_vs_aqi_logscale_plot",
+    "correlation_barchart": "correlation_barchart",
+}
+
+# figures that take a target year / month
+YEAR_FIGURES = {"static_map", "map_vif_panel", "smoke_exposure"}
+
+
+# -------------------------------------------------------------------
+# WORKER
+# -------------------------------------------------------------------
+def _init_worker():
+    matplotlib.use("Agg", force=True)
+
+
+def render_one(job):
+    """Render one figure in the current process; never raises."""
+    name, out_dir, formats, dpi, year, month = job
+    import importlib
+
+    import matplotlib.pyplot as plt
+
+    from figure_output import save_figure
+
+    module_name, func_name, kind = FIGURES[name]
+    entry = {"figure": name, "outputs": [], "seconds": None, "error": None}
+    t0 = time.perf_counter()
+    try:
+        func = getattr(importlib.import_module(module_name), func_name)
+        if kind == "fig":
+            fig = func()
+            entry["outputs"] = save_figure(fig, FIGURE_STEMS[name], out_dir, formats, dpi)
+        else:
+            kwargs = {"out_dir": out_dir, "formats": formats, "dpi": dpi, "show": False}
+            if name in YEAR_FIGURES:
+                kwargs.update(target_year=year, target_month=month)
+            entry["outputs"] = func(**kwargs)
+    except Exception as err:  # report in the manifest, keep rendering the rest
+        entry["error"] = f"{type(err).__name__}: {err}"
+        entry["traceback"] = traceback.format_exc()
+    finally:
+        plt.close("all")
+        entry["seconds"] = round(time.perf_counter() - t0, 3)
+    return entry
+
+
+# -------------------------------------------------------------------
+# BATCH
+# -------------------------------------------------------------------
+def render_all(names=None, out_dir=OUT_DIR, formats=("png",), dpi=300, workers=None, year=2020, month=None):
+    """
+    Render the selected figures across worker processes and write
+    <out_dir>/manifest.json. Returns the manifest dict.
+    """
+    names = list(names or FIGURES)
+    unknown = set(names) - set(FIGURES)
+    if unknown:
+        raise ValueError(f"Unknown figure(s): {', '.join(sorted(unknown))}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(name, out_dir, tuple(formats), dpi, year, month) for name in names]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+
+    t0 = time.perf_counter()
+    if workers == 1:
+        entries = [render_one(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            entries = list(pool.map(render_one, jobs))
+
+    manifest = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "out_dir": out_dir,
+        "formats": list(formats),
+        "dpi": dpi,
+        "target_year": year,
+        "target_month": month,
+        "seconds": round(time.perf_counter() - t0, 3),
+        "figures": entries,
+    }
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+# -------------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the project's figures headlessly (Agg backend).")
+    parser.add_argument("figures", nargs="*", help=f"subset to render (default: all): {', '.join(FIGURES)}")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    parser.add_argument("--formats", default="png", help="comma-separated, e.g. png,svg,pdf")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--year", type=int, default=2020, help="year for the map figures")
+    parser.add_argument("--month", type=int, default=None, help="month for the map figures (default: year average)")
+    args = parser.parse_args()
+
+    manifest = render_all(
+        args.figures,
+        out_dir=args.out_dir,
+        formats=[fmt.strip() for fmt in args.formats.split(",") if fmt.strip()],
+        dpi=args.dpi,
+        workers=args.workers,
+        year=args.year,
+        month=args.month,
+    )
+
+    failed = [entry for entry in manifest["figures"] if entry["error"]]
+    for entry in manifest["figures"]:
+        status = "FAILED " + entry["error"] if entry["error"] else f"{len(entry['outputs'])} file(s)"
+        print(f"{entry['figure']:22s} {entry['seconds']:7.2f}s  {status}")
+    print(f"Manifest: {os.path.join(args.out_dir, MANIFEST_NAME)}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import sys
+from functools import lru_cache
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+from county_geometry import NY_STATEFP, PLOT_CRS, label_anchors
+from table_store import read_table, table_path, write_table
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+WEIGHTS_TABLE = "county_region_weights"     # STATEFP, County, Region, distance_km, weight, fingerprint
+EXPOSURE_TABLE = "county_smoke_exposure"    # STATEFP, date, County, Exposure
+VIF_TABLE = "merged_ny_vif"
+
+# (lon, lat) of each region's fire-alert zone: the boreal forest where
+# the VIIRS alerts cluster, not the province's population or centroid.
+REGION_REFERENCE_POINTS = {
+    "Ontario_VIF": (-89.0, 51.0),           # Northwest / Far North fire regions
+    "Quebec_VIF": (-75.5, 50.5),            # James Bay (Eeyou Istchee)
+    "NL_VIF": (-62.0, 53.5),                # central Labrador
+}
+
+# weight = (REFERENCE_DISTANCE_KM / distance) ** DISTANCE_POWER, so one
+# alert at 1000 km counts 1 and one at 500 km counts 4
+REFERENCE_DISTANCE_KM = 1000.0
+DISTANCE_POWER = 2.0
+EARTH_RADIUS_KM = 6371.0088
+GEOGRAPHIC_CRS = "EPSG:4326"
+
+
+# -------------------------------------------------------------------
+# DISTANCES / WEIGHTS
+# -------------------------------------------------------------------
+def haversine_km(lon1, lat1, lon2, lat2):
+    """Great-circle distance between broadcastable arrays of lon/lat degrees."""
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(v, dtype=float)) for v in (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def county_lonlat(statefp=NY_STATEFP):
+    """County -> (lon, lat) of its label anchor (a point inside the county)."""
+    anchors = label_anchors(statefp)
+    points = gpd.GeoSeries(
+        gpd.points_from_xy(anchors["label_x"], anchors["label_y"]), index=anchors.index, crs=PLOT_CRS
+    ).to_crs(GEOGRAPHIC_CRS)
+    return pd.DataFrame({"lon": points.x.to_numpy(), "lat": points.y.to_numpy()}, index=anchors.index)
+
+
+def distance_matrix(counties, reference_points=REGION_REFERENCE_POINTS):
+    """(counties x regions) great-circle distances in km, from a lon/lat frame."""
+    ref = np.array(list(reference_points.values()), dtype=float)
+    km = haversine_km(
+        counties["lon"].to_numpy()[:, None], counties["lat"].to_numpy()[:, None],
+        ref[None, :, 0], ref[None, :, 1],
+    )
+    return pd.DataFrame(km, index=counties.index, columns=list(reference_points))
+
+
+def distance_weights(distances, reference_km=REFERENCE_DISTANCE_KM, power=DISTANCE_POWER):
+    """Inverse-distance weights, 1 at reference_km."""
+    return (reference_km / distances) ** power
+
+
+def weights_fingerprint(statefp=NY_STATEFP, reference_points=REGION_REFERENCE_POINTS):
+    """
+    Hash of everything one state's weights depend on: the reference points,
+    the distance decay and the county anchors (so a re-simplified or
+    re-downloaded shapefile changes it too).
+    """
+    spec = {
+        "points": {region: list(point) for region, point in reference_points.items()},
+        "reference_km": REFERENCE_DISTANCE_KM,
+        "power": DISTANCE_POWER,
+    }
+    h = hashlib.sha256(json.dumps(spec, sort_keys=True).encode())
+    h.update(pd.util.hash_pandas_object(label_anchors(statefp), index=True).to_numpy().tobytes())
+    return h.hexdigest()[:20]
+
+
+def build_weights(statefp=NY_STATEFP, reference_points=REGION_REFERENCE_POINTS):
+    """Long weights table (STATEFP, County, Region, distance_km, weight, fingerprint) for one state."""
+    distances = distance_matrix(county_lonlat(statefp), reference_points)
+    weights = distance_weights(distances, REFERENCE_DISTANCE_KM, DISTANCE_POWER)
+    return (
+        pd.DataFrame({
+            "distance_km": distances.stack(),
+            "weight": weights.stack(),
+        })
+        .rename_axis(["County", "Region"])
+        .reset_index()
+        .assign(STATEFP=statefp, fingerprint=weights_fingerprint(statefp, reference_points))
+        [["STATEFP", "County", "Region", "distance_km", "weight", "fingerprint"]]
+    )
+
+
+# -------------------------------------------------------------------
+# CACHE
+# -------------------------------------------------------------------
+def _cached_weights():
+    if not os.path.exists(table_path(WEIGHTS_TABLE)):
+        return None
+    weights = read_table(WEIGHTS_TABLE)
+    return weights.assign(STATEFP=weights["STATEFP"].astype(str),
+                          County=weights["County"].astype(str),
+                          Region=weights["Region"].astype(str))
+
+
+def store_weights(statefps=(NY_STATEFP,)):
+    """Rebuild the given states' weights and merge them into WEIGHTS_TABLE."""
+    fresh = pd.concat([build_weights(statefp) for statefp in statefps], ignore_index=True)
+    cached = _cached_weights()
+    if cached is not None:
+        fresh = pd.concat([cached[~cached["STATEFP"].isin(list(statefps))], fresh], ignore_index=True)
+    write_table(fresh, WEIGHTS_TABLE)
+    weight_matrix.cache_clear()
+    return fresh
+
+
+@lru_cache(maxsize=None)
+def weight_matrix(statefp=NY_STATEFP):
+    """
+    (counties x regions) weight matrix for one state, columns in
+    REGION_REFERENCE_POINTS order. Read from WEIGHTS_TABLE; states missing
+    from it, or stored under a different weights_fingerprint (new points,
+    decay or geometry), are rebuilt and stored first.
+    """
+    cached = _cached_weights()
+    state = None if cached is None else cached[cached["STATEFP"] == statefp]
+    if (state is None or state.empty or "fingerprint" not in state.columns
+            or (state["fingerprint"].astype(str) != weights_fingerprint(statefp)).any()):
+        weights = store_weights([statefp])
+        state = weights[weights["STATEFP"] == statefp]
+    return (
+        state.pivot_table(index="County", columns="Region", values="weight", aggfunc="mean")
+        [list(REGION_REFERENCE_POINTS)]
+    )
+
+
+# -------------------------------------------------------------------
+# EXPOSURE
+# -------------------------------------------------------------------
+def exposure_index(weights, vif, date_col="date"):
+    """
+    Monthly exposure of every county: E = W @ V, with W the (counties x
+    regions) weights and V the (regions x months) VIF counts taken from the
+    columns of `vif` named like the columns of `weights`. A month with a
+    missing region count is NaN. Returns a long (date, County, Exposure)
+    table.
+    """
+    vif = vif.sort_values(date_col)
+    v = vif[list(weights.columns)].to_numpy(dtype=float).T       # (regions, months)
+    exposure = weights.to_numpy(dtype=float) @ v                 # (counties, months)
+    counties = weights.index.to_numpy()
+    return pd.DataFrame({
+        "date": np.repeat(vif[date_col].to_numpy(), len(counties)),
+        "County": np.tile(counties, v.shape[1]),
+        "Exposure": exposure.T.ravel(),
+    })
+
+
+def county_exposure(vif, statefp=NY_STATEFP):
+    """exposure_index for one state's counties, using the cached weights."""
+    return exposure_index(weight_matrix(statefp), vif)
+
+
+# -------------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------------
+if __name__ == "__main__":
+    # python smoke_exposure.py [STATEFP ...]   (default: New York)
+    statefps = sys.argv[1:] or [NY_STATEFP]
+    weights = store_weights(statefps)
+    print("\n=== County x region weights (nearest / farthest county per region) ===\n")
+    state_weights = weights[weights["STATEFP"].isin(statefps)]
+    by_region = state_weights.groupby("Region")["distance_km"]
+    print(state_weights.loc[by_region.idxmin().tolist() + by_region.idxmax().tolist()]
+          .round(2).to_string(index=False))
+
+    vif = read_table(VIF_TABLE)
+    exposure = pd.concat(
+        [county_exposure(vif, statefp).assign(STATEFP=statefp) for statefp in statefps],
+        ignore_index=True,
+    )
+    print(f"\n{len(exposure)} county-months of exposure for {exposure['County'].nunique()} counties")
+    write_table(exposure, EXPOSURE_TABLE)
@@ -0,0 +1,172 @@
+import os
+import sys
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; fall back to plain CSV
+    feather = None
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+STORE_DIR = "store"
+EXPORT_CSV = False  # also write <name>.csv next to the columnar file
+
+# Columns stored as categoricals / parsed as dates wherever they appear
+CATEGORICAL_COLUMNS = ("Region", "County", "State", "STATEFP")
+DATE_COLUMNS = ("date",)
+
+# Tables the pipeline hands between scripts
+PIPELINE_TABLES = (
+    "monthly_on",
+    "monthly_qc",
+    "monthly_nl",
+    "monthly_vif",
+    "monthly_statewide",
+    "merged_ny_vif",
+    "ny_monthly_county_aqi",
+)
+
+
+# -------------------------------------------------------------------
+# PATHS / TYPES
+# -------------------------------------------------------------------
+def table_path(name, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f"{name}.feather")
+
+
+def csv_path(name):
+    return f"{name}.csv"
+
+
+def dataset_path(name, store_dir=STORE_DIR):
+    return os.path.join(store_dir, name)
+
+
+def apply_schema(df):
+    """datetime64 dates, categorical region/county, everything else as-is."""
+    df = df.copy()
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col])
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+# -------------------------------------------------------------------
+# WRITE / READ
+# -------------------------------------------------------------------
+def write_table(df, name, csv=EXPORT_CSV, store_dir=STORE_DIR):
+    """
+    Write `df` as a typed, uncompressed Feather (Arrow IPC) file so readers
+    can memory-map it. csv=True additionally exports <name>.csv.
+    Without pyarrow the CSV is the only output.
+    """
+    df = apply_schema(df)
+
+    if feather is not None:
+        os.makedirs(store_dir, exist_ok=True)
+        feather.write_feather(
+            df.reset_index(drop=True),
+            table_path(name, store_dir),
+            compression="uncompressed",
+        )
+    if csv or feather is None:
+        df.to_csv(csv_path(name), index=False)
+    return df
+
+
+def table_exists(name, store_dir=STORE_DIR):
+    """True when read_table(name) has a columnar file or CSV to load."""
+    return (feather is not None and os.path.exists(table_path(name, store_dir))) or os.path.exists(csv_path(name))
+
+
+def read_table(name, columns=None, store_dir=STORE_DIR):
+    """
+    Load a pipeline table. Prefers the memory-mapped columnar file; falls
+    back to <name>.csv (typed via apply_schema) when it has not been
+    written yet.
+    """
+    path = table_path(name, store_dir)
+    if feather is not None and os.path.exists(path):
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        return table.to_pandas()
+
+    usecols = list(columns) if columns is not None else None
+    return apply_schema(pd.read_csv(csv_path(name), usecols=usecols))
+
+
+# -------------------------------------------------------------------
+# PARTITIONED DATASETS
+# -------------------------------------------------------------------
+def _require_pyarrow():
+    if feather is None:
+        raise ImportError("Partitioned datasets need `pip install pyarrow`")
+
+
+def _partition_keys(path):
+    """Hive partition column names, read off the key=value directory names."""
+    keys = []
+    while True:
+        subdirs = sorted(d for d in os.listdir(path) if "=" in d and os.path.isdir(os.path.join(path, d)))
+        if not subdirs:
+            return keys
+        keys.append(subdirs[0].split("=", 1)[0])
+        path = os.path.join(path, subdirs[0])
+
+
+def write_dataset(df, name, partition_cols, store_dir=STORE_DIR):
+    """
+    Write `df` as a hive-style Parquet dataset, one directory per partition
+    (store/<name>/STATEFP=36/...). Partitions present in `df` replace the
+    ones on disk; all other partitions are left untouched.
+    """
+    _require_pyarrow()
+    df = apply_schema(df)
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    pq.write_to_dataset(
+        table,
+        dataset_path(name, store_dir),
+        partition_cols=list(partition_cols),
+        existing_data_behavior="delete_matching",
+    )
+    return df
+
+
+def read_dataset(name, filters=None, columns=None, store_dir=STORE_DIR):
+    """
+    Load a partitioned dataset, reading only the partitions that match
+    `filters` (pyarrow DNF, e.g. [("STATEFP", "in", ["36", "50"])]).
+    Partition values stay strings so FIPS codes keep their leading zero.
+    """
+    _require_pyarrow()
+    path = dataset_path(name, store_dir)
+    partitioning = ds.partitioning(pa.schema([(key, pa.string()) for key in _partition_keys(path)]), flavor="hive")
+    table = pq.read_table(path, columns=columns, filters=filters, partitioning=partitioning)
+    return apply_schema(table.to_pandas())
+
+
+def dataset_exists(name, store_dir=STORE_DIR):
+    return feather is not None and os.path.isdir(dataset_path(name, store_dir))
+
+
+# -------------------------------------------------------------------
+# MAIN: seed the store from the CSVs already on disk
+# -------------------------------------------------------------------
+if __name__ == "__main__":
+    if feather is None:
+        sys.exit("pyarrow is required to build the columnar store")
+
+    for name in PIPELINE_TABLES:
+        if not os.path.exists(csv_path(name)):
+            print(f"Skipping {name}: {csv_path(name)} not found")
+            continue
+        df = write_table(pd.read_csv(csv_path(name)), name)
+        print(f"Stored {table_path(name)} ({len(df)} rows)")
@@ -0,0 +1,109 @@
+import glob
+import sys
+import zipfile
+
+import pandas as pd
+
+from archive_reader import select_member
+from table_store import write_table
+from vif_ingest import map_archives, region_from_archive
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+ARCHIVE_PATTERN = "Tree cover loss by dominant driver in *.zip"
+MEMBER_PATTERN = "tree_cover_loss*.csv"
+OUTPUT_TABLE = "tree_cover_loss"
+CHUNKSIZE = 100_000
+
+DRIVER_COL = "drivers_type"
+YEAR_COL = "loss_year"
+VALUE_COLS = ["loss_area_ha", "gross_carbon_emissions_Mg"]
+DTYPES = {
+    DRIVER_COL: "category",
+    YEAR_COL: "int16",
+    "loss_area_ha": "float32",
+    "gross_carbon_emissions_Mg": "float32",
+}
+
+
+# -------------------------------------------------------------------
+# SINGLE ARCHIVE: annual loss by driver
+# -------------------------------------------------------------------
+def process_archive(zip_path, region=None, chunksize=CHUNKSIZE):
+    """
+    Stream the loss-by-driver CSV out of one archive and return
+    Region, loss_year, driver, loss_area_ha, gross_carbon_emissions_Mg
+    with one row per year x driver.
+    """
+    if region is None:
+        region = region_from_archive(zip_path)
+
+    partials = []
+    with zipfile.ZipFile(zip_path) as z:
+        with z.open(select_member(z, MEMBER_PATTERN)) as f:
+            reader = pd.read_csv(f, usecols=list(DTYPES), dtype=DTYPES, chunksize=chunksize)
+            for chunk in reader:
+                # sum in float64 so many small chunks don't lose precision
+                partials.append(
+                    chunk.astype({col: "float64" for col in VALUE_COLS})
+                    .groupby([YEAR_COL, DRIVER_COL], observed=True)[VALUE_COLS]
+                    .sum()
+                )
+
+    annual = (
+        pd.concat(partials)
+        .groupby(level=[YEAR_COL, DRIVER_COL], observed=True)
+        .sum()
+        .astype("float32")
+        .reset_index()
+        .rename(columns={DRIVER_COL: "driver"})
+    )
+    annual[YEAR_COL] = annual[YEAR_COL].astype("int16")
+    annual["driver"] = annual["driver"].astype("category")
+    annual.insert(0, "Region", region)
+    return annual
+
+
+def _process_archive_job(zip_path):
+    return process_archive(zip_path)
+
+
+# -------------------------------------------------------------------
+# MANY ARCHIVES: one long annual table
+# -------------------------------------------------------------------
+def ingest_archives(zip_paths, max_workers=None):
+    frames = map_archives(_process_archive_job, zip_paths, max_workers)
+    if not frames:
+        return pd.DataFrame(columns=["Region", YEAR_COL, "driver"] + VALUE_COLS)
+
+    # union the per-archive driver categories before stacking
+    drivers = sorted(set().union(*(frame["driver"].cat.categories for frame in frames)))
+    for frame in frames:
+        frame["driver"] = frame["driver"].cat.set_categories(drivers)
+
+    annual = pd.concat(frames, ignore_index=True)
+    annual["Region"] = annual["Region"].astype("category")
+    return annual.sort_values(["Region", YEAR_COL, "driver"]).reset_index(drop=True)
+
+
+# -------------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------------
+if __name__ == "__main__":
+    paths = sys.argv[1:] or sorted(glob.glob(ARCHIVE_PATTERN))
+    tree_cover_loss = ingest_archives(paths)
+
+    print(f"Ingested {len(paths)} archives:")
+    print(
+        tree_cover_loss
+        .groupby(["Region", "driver"], observed=True)["loss_area_ha"]
+        .sum()
+        .unstack("driver")
+        .round(0)
+    )
+    print("\nStructure:")
+    print(tree_cover_loss.info())
+
+    write_table(tree_cover_loss, OUTPUT_TABLE)
+    print(f"Saved {OUTPUT_TABLE}")
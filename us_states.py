@@ -0,0 +1,36 @@
+# -------------------------------------------------------------------
+# State name (as spelled in the EPA AQI files), 2-digit FIPS code
+# (STATEFP in the Census county shapefile) and USPS abbreviation
+# -------------------------------------------------------------------
+STATES = [
+    ("Alabama", "01", "AL"), ("Alaska", "02", "AK"), ("Arizona", "04", "AZ"),
+    ("Arkansas", "05", "AR"), ("California", "06", "CA"), ("Colorado", "08", "CO"),
+    ("Connecticut", "09", "CT"), ("Delaware", "10", "DE"), ("District Of Columbia", "11", "DC"),
+    ("Florida", "12", "FL"), ("Georgia", "13", "GA"), ("Hawaii", "15", "HI"),
+    ("Idaho", "16", "ID"), ("Illinois", "17", "IL"), ("Indiana", "18", "IN"),
+    ("Iowa", "19", "IA"), ("Kansas", "20", "KS"), ("Kentucky", "21", "KY"),
+    ("Louisiana", "22", "LA"), ("Maine", "23", "ME"), ("Maryland", "24", "MD"),
+    ("Massachusetts", "25", "MA"), ("Michigan", "26", "MI"), ("Minnesota", "27", "MN"),
+    ("Mississippi", "28", "MS"), ("Missouri", "29", "MO"), ("Montana", "30", "MT"),
+    ("Nebraska", "31", "NE"), ("Nevada", "32", "NV"), ("New Hampshire", "33", "NH"),
+    ("New Jersey", "34", "NJ"), ("New Mexico", "35", "NM"), ("New York", "36", "NY"),
+    ("North Carolina", "37", "NC"), ("North Dakota", "38", "ND"), ("Ohio", "39", "OH"),
+    ("Oklahoma", "40", "OK"), ("Oregon", "41", "OR"), ("Pennsylvania", "42", "PA"),
+    ("Rhode Island", "44", "RI"), ("South Carolina", "45", "SC"), ("South Dakota", "46", "SD"),
+    ("Tennessee", "47", "TN"), ("Texas", "48", "TX"), ("Utah", "49", "UT"),
+    ("Vermont", "50", "VT"), ("Virginia", "51", "VA"), ("Washington", "53", "WA"),
+    ("West Virginia", "54", "WV"), ("Wisconsin", "55", "WI"), ("Wyoming", "56", "WY"),
+    ("Puerto Rico", "72", "PR"), ("Virgin Islands", "78", "VI"),
+]
+
+STATE_FIPS = {name: fips for name, fips, _ in STATES}
+FIPS_STATE = {fips: name for name, fips, _ in STATES}
+FIPS_ABBR = {fips: abbr for _, fips, abbr in STATES}
+
+
+def state_name(statefp):
+    return FIPS_STATE.get(statefp, statefp)
+
+
+def state_abbr(statefp):
+    return FIPS_ABBR.get(statefp, statefp)
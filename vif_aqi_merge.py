@@ -1,36 +1,32 @@
-import pandas as pd
+from instrumentation import span
+from table_store import read_table, write_table
+from vif_ingest import align_regions, read_monthly_vif
 
-# Load cleaned monthly datasets
-monthly_on = pd.read_csv("monthly_on.csv", parse_dates=["date"])
-monthly_qc = pd.read_csv("monthly_qc.csv", parse_dates=["date"])
-monthly_nl = pd.read_csv("monthly_nl.csv", parse_dates=["date"])
-monthly_statewide = pd.read_csv("monthly_statewide.csv", parse_dates=["date"])
+# Load the long monthly VIF table (date, Region, VIF_count) from vif_ingest.py
+# (or the per-province monthly_on/qc/nl tables if it has not run yet) and
+# the statewide NY AQI
+monthly_vif = read_monthly_vif()
+monthly_statewide = read_table("monthly_statewide")
 
-# Merge all provinces into one VIF table
-vif_all = (
-    monthly_on[["date","VIF_count"]].rename(columns={"VIF_count":"Ontario_VIF"})
-    .merge(
-        monthly_qc[["date","VIF_count"]].rename(columns={"VIF_count":"Quebec_VIF"}),
-        on="date",
-        how="outer"
-    )
-    .merge(
-        monthly_nl[["date","VIF_count"]].rename(columns={"VIF_count":"NL_VIF"}),
-        on="date",
-        how="outer"
-    )
-    .sort_values("date")
-)
+# Align every ingested region onto one monthly index in a single step;
+# columns are discovered from the data (Ontario_VIF, Quebec_VIF, NL_VIF, ...)
+vif_all = align_regions(monthly_vif)
 
 print("VIF ALL preview:")
 print(vif_all.head())
 print(vif_all.tail())
 
 # Merge with NY AQI statewide
-merged_ny_vif = vif_all.merge(monthly_statewide, on="date", how="inner")
+with span("merge", "vif_aqi_merge", rows_in=len(vif_all)) as s:
+    merged_ny_vif = (
+        vif_all
+        .join(monthly_statewide.set_index("date"), how="inner")
+        .reset_index()
+    )
+    s.set(rows_out=len(merged_ny_vif))
 
 print("\nMerged NY AQI + All Provinces:")
 print(merged_ny_vif.head())
 print(merged_ny_vif.tail())
 
-merged_ny_vif.to_csv("merged_ny_vif.csv", index=False)
+write_table(merged_ny_vif, "merged_ny_vif")
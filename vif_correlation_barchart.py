@@ -1,54 +1,52 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 
-# Load correlation results (same computation as before)
-df = pd.read_csv("merged_ny_vif.csv", parse_dates=["date"])
+from figure_output import save_figure
+from lag_correlation import lag_correlations
+from table_store import read_table
 
 vif_cols = ["Ontario_VIF", "Quebec_VIF", "NL_VIF"]
 
-# Compute correlations
-results = {}
-max_lag = 6
 
-# 0-lag
-corr_0 = df[vif_cols + ["NY_AQI"]].corr()["NY_AQI"].drop("NY_AQI")
-results["lag_0"] = corr_0
+def plot_correlation_barchart(df=None, max_lag=6):
+    """Bar chart of VIF vs NY AQI correlation by lag; returns the figure."""
+    if df is None:
+        df = read_table("merged_ny_vif")
 
-# lags 1–6
-for lag in range(1, max_lag + 1):
-    lagged = df.copy()
-    lagged["NY_AQI_lag"] = lagged["NY_AQI"].shift(-lag)
-    corr = lagged[vif_cols + ["NY_AQI_lag"]].corr()["NY_AQI_lag"].drop("NY_AQI_lag")
-    results[f"lag_{lag}"] = corr
+    # Compute correlations for lags 0–max_lag in one pass
+    corr_df = lag_correlations(df, vif_cols, "NY_AQI", max_lag=max_lag)
 
-corr_df = pd.DataFrame(results)
+    # ---------------------------
+    # Bar Chart
+    # ---------------------------
+    lags = corr_df.columns
+    x = np.arange(len(lags))  # positions
 
-# ---------------------------
-# Bar Chart
-# ---------------------------
-lags = corr_df.columns
-x = np.arange(len(lags))  # positions
+    width = 0.25
 
-width = 0.25
+    fig, ax = plt.subplots(figsize=(12, 6))
 
-fig, ax = plt.subplots(figsize=(12, 6))
+    # Bars for each province
+    ax.bar(x - width, corr_df.loc["Ontario_VIF"], width, label="Ontario", color="#1f77b4")
+    ax.bar(x,         corr_df.loc["Quebec_VIF"],  width, label="Quebec", color="#ff7f0e")
+    ax.bar(x + width, corr_df.loc["NL_VIF"],      width, label="NL",     color="#2ca02c")
 
-# Bars for each province
-ax.bar(x - width, corr_df.loc["Ontario_VIF"], width, label="Ontario", color="#1f77b4")
-ax.bar(x,         corr_df.loc["Quebec_VIF"],  width, label="Quebec", color="#ff7f0e")
-ax.bar(x + width, corr_df.loc["NL_VIF"],      width, label="NL",     color="#2ca02c")
+    # Labels & formatting
+    ax.set_ylabel("Correlation Coefficient")
+    ax.set_xlabel("Lag (Months)")
+    ax.set_title("Correlation of VIF Alerts with New York AQI (By Lag)")
+    ax.set_xticks(x)
+    ax.set_xticklabels(lags)
+    ax.axhline(0, color="black", linewidth=1)
 
-# Labels & formatting
-ax.set_ylabel("Correlation Coefficient")
-ax.set_xlabel("Lag (Months)")
-ax.set_title("Correlation of VIF Alerts with New York AQI (By Lag)")
-ax.set_xticks(x)
-ax.set_xticklabels(lags)
-ax.axhline(0, color="black", linewidth=1)
+    ax.legend()
+    ax.grid(axis="y", linestyle="--", alpha=0.5)
 
-ax.legend()
-ax.grid(axis="y", linestyle="--", alpha=0.5)
+    fig.tight_layout()
+    return fig
 
-plt.tight_layout()
-plt.show()
+
+if __name__ == "__main__":
+    fig = plot_correlation_barchart()
+    save_figure(fig, "correlation_barchart")
+    plt.show()
@@ -1,30 +1,18 @@
-import pandas as pd
+from lag_correlation import lag_correlations, rolling_lag_correlations, surface_to_frame
+from lag_significance import lag_significance
+from table_store import read_table, write_table
 
 # Load merged dataset
-df = pd.read_csv("merged_ny_vif.csv", parse_dates=["date"])
+df = read_table("merged_ny_vif")
 
 # Columns to test
 vif_cols = ["Ontario_VIF", "Quebec_VIF", "NL_VIF"]
 
-# STORE RESULTS
-results = {}
-
-# -------------------------------
-# 0-LAG CORRELATIONS
-# -------------------------------
-corr_0 = df[vif_cols + ["NY_AQI"]].corr()["NY_AQI"].drop("NY_AQI")
-results["lag_0"] = corr_0
-
 # -------------------------------
-# LAG CORRELATIONS (1–6 months)
+# 0-LAG + LAG CORRELATIONS (1–6 months), all in one pass
 # -------------------------------
 max_lag = 6
-for lag in range(1, max_lag + 1):
-    lagged_df = df.copy()
-    lagged_df["NY_AQI_lag"] = lagged_df["NY_AQI"].shift(-lag)
-
-    corr_lag = lagged_df[vif_cols + ["NY_AQI_lag"]].corr()["NY_AQI_lag"].drop("NY_AQI_lag")
-    results[f"lag_{lag}"] = corr_lag
+correlation_table = lag_correlations(df, vif_cols, "NY_AQI", max_lag=max_lag)
 
 # -------------------------------
 # PRINT CLEAN TABLE
@@ -33,5 +21,25 @@ print("\n=== Correlation of VIF Alerts vs New York AQI ===\n")
 print("Positive value = higher VIF associated with higher AQI")
 print("Negative value = higher VIF associated with lower AQI\n")
 
-correlation_table = pd.DataFrame(results)
 print(correlation_table.round(3))
+
+# -------------------------------
+# SIGNIFICANCE (circular-shift permutation p-value, block-bootstrap 95% CI)
+# -------------------------------
+print("\n=== Significance (autocorrelation-aware resampling) ===\n")
+significance = lag_significance(df, vif_cols, "NY_AQI", max_lag=max_lag, seed=0)
+print(significance.round(3).to_string(index=False))
+
+# -------------------------------
+# ROLLING 24-MONTH WINDOWS (time x region x lag surface)
+# -------------------------------
+window = 24
+surface, dates, regions, lags = rolling_lag_correlations(df, window, vif_cols, "NY_AQI", max_lag=max_lag)
+rolling = surface_to_frame(surface, dates, regions, lags)
+
+print(f"\n=== Rolling {window}-month correlation: strongest window per region ===\n")
+strongest = rolling.loc[rolling["r"].abs().groupby(rolling["Region"]).idxmax()]
+print(strongest.assign(r=strongest["r"].round(3)).to_string(index=False))
+
+# Long table (date = last month of the window, Region, lag, r)
+write_table(rolling, "rolling_lag_correlations")
@@ -0,0 +1,269 @@
+import glob
+import os
+import re
+import sys
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from archive_reader import read_archive_csv
+from instrumentation import span, traced
+from table_store import read_table, table_exists, write_table
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+ARCHIVE_PATTERN = "Historical Fire Alerts in *.zip"
+LONG_OUTPUT_TABLE = "monthly_vif"
+# Per-region tables written by the vif_<province>_processing.py wrappers
+# (committed as CSVs); read_monthly_vif stacks them when monthly_vif is absent
+REGION_TABLES = ["monthly_on", "monthly_qc", "monthly_nl"]
+
+START_YEAR = 2010
+END_YEAR = 2021
+
+YEAR_COL = "alert__year"
+WEEK_COL = "alert__week"
+COUNT_COL = "alert__count"
+
+ALERT_MEMBER = "*alerts__count*.csv"
+ALERT_DTYPES = {YEAR_COL: "int16", WEEK_COL: "int8", COUNT_COL: "int32"}
+
+_REGION_RE = re.compile(r" in (?P<region>[^,]+)(?:,.*)?\.zip$")
+
+# Short column prefixes for regions whose full name is unwieldy
+REGION_ABBREVIATIONS = {"Newfoundland and Labrador": "NL"}
+
+# Column order of the aligned table (Ontario_VIF, Quebec_VIF, NL_VIF, as
+# merged_ny_vif has always been laid out); other regions follow by name
+REGION_ORDER = ["Ontario", "Quebec", "Newfoundland and Labrador"]
+
+
+# -------------------------------------------------------------------
+# HELPERS
+# -------------------------------------------------------------------
+def region_from_archive(zip_path):
+    """
+    "Historical Fire Alerts in Québec, Canada.zip" -> "Quebec"
+    Accents are dropped so region names stay plain ASCII, matching the
+    Region values already used in monthly_on/qc/nl.csv.
+    """
+    name = os.path.basename(zip_path)
+    match = _REGION_RE.search(name)
+    if match is None:
+        raise ValueError(f"Cannot infer region from archive name: {name}")
+    region = unicodedata.normalize("NFKD", match.group("region"))
+    return region.encode("ascii", "ignore").decode("ascii").strip()
+
+
+def _week1_monday(year):
+    """Days since 1970-01-01 of the Monday starting ISO week 1 of `year`."""
+    jan4 = (year - 1970).astype("datetime64[Y]").astype("datetime64[D]").astype(np.int64) + 3
+    # 1970-01-01 was a Thursday, so (days + 3) % 7 is the weekday with Monday = 0
+    return jan4 - (jan4 + 3) % 7
+
+
+def _iso_week_days(year, week):
+    start = _week1_monday(year)
+    weeks_in_year = (_week1_monday(year + 1) - start) // 7
+    days = start + (week - 1) * 7
+    valid = (week >= 1) & (week <= weeks_in_year)
+    return np.where(valid, days, np.iinfo(np.int64).min)
+
+
+@traced("iso_week_parse")
+def iso_week_to_date(year, week, lookup=True):
+    """
+    Vectorized (ISO year, ISO week) -> Monday of that week as datetime64.
+
+    Integer-only replacement for building "YYYY-Www-1" strings and parsing
+    them with format="%G-W%V-%u". Weeks outside the year (e.g. week 53 of
+    a 52-week year) come back as NaT, like errors="coerce" did.
+
+    lookup=True converts each possible year/week pair once (a small
+    years x 54 table) and indexes into it, which is cheaper for long alert
+    tables than doing the calendar arithmetic per row.
+    """
+    year = np.asarray(year, dtype=np.int64)
+    week = np.asarray(week, dtype=np.int64)
+
+    if lookup and year.size:
+        first_year = year.min()
+        years = np.arange(first_year, year.max() + 1)
+        table = _iso_week_days(years[:, None], np.arange(54)[None, :]).ravel()
+        in_range = (week >= 0) & (week <= 53)
+        idx = (year - first_year) * 54 + np.where(in_range, week, 0)
+        days = np.where(in_range, table[idx], np.iinfo(np.int64).min)
+    else:
+        days = _iso_week_days(year, week)
+
+    # int64 min is the NaT sentinel for datetime64
+    return days.astype("datetime64[D]").astype("datetime64[ns]")
+
+
+def read_alerts(zip_path, use_cache=True):
+    """
+    Year / week / count columns of the alert CSV inside a GFW fire-alert
+    archive, narrow dtypes, served from the decoded-archive cache when the
+    archive is unchanged.
+    """
+    return read_archive_csv(
+        zip_path,
+        ALERT_MEMBER,
+        usecols=list(ALERT_DTYPES),
+        dtype=ALERT_DTYPES,
+        use_cache=use_cache,
+    )
+
+
+# -------------------------------------------------------------------
+# SINGLE ARCHIVE: weekly -> monthly
+# -------------------------------------------------------------------
+def process_archive(zip_path, start_year=START_YEAR, end_year=END_YEAR, region=None):
+    """
+    Returns the monthly VIF table for one archive with columns
+    date, VIF_count, Region (same layout as monthly_on.csv).
+    """
+    if region is None:
+        region = region_from_archive(zip_path)
+
+    alerts = read_alerts(zip_path)
+    alerts = alerts[(alerts[YEAR_COL] >= start_year) & (alerts[YEAR_COL] <= end_year)].copy()
+
+    # Convert (year, week) to a real date – Monday of ISO week
+    alerts["date"] = iso_week_to_date(
+        alerts[YEAR_COL].to_numpy(),
+        alerts[WEEK_COL].to_numpy(),
+    )
+    alerts = alerts.dropna(subset=["date"])
+
+    with span("groupby_resample", "vif_ingest", rows_in=len(alerts), region=region) as s:
+        # Weekly total alerts
+        alerts[COUNT_COL] = alerts[COUNT_COL].astype("int64")
+        weekly = (
+            alerts.groupby("date", as_index=False)[COUNT_COL]
+                  .sum()
+                  .rename(columns={COUNT_COL: "VIF_count"})
+        )
+
+        # Monthly total alerts (sum of weekly counts in each month)
+        monthly = (
+            weekly
+            .set_index("date")
+            .resample("MS")["VIF_count"]
+            .sum()
+            .reset_index()
+        )
+        s.set(rows_out=len(monthly))
+    monthly["Region"] = region
+    return monthly
+
+
+def _process_archive_job(job):
+    zip_path, start_year, end_year = job
+    return process_archive(zip_path, start_year, end_year)
+
+
+# -------------------------------------------------------------------
+# MANY ARCHIVES: one long monthly table
+# -------------------------------------------------------------------
+def map_archives(fn, jobs, max_workers=None):
+    """Run fn over per-archive jobs, one process per archive when it pays."""
+    jobs = list(jobs)
+    if max_workers == 1 or len(jobs) <= 1:
+        return [fn(job) for job in jobs]
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, jobs))
+
+
+def ingest_archives(zip_paths, start_year=START_YEAR, end_year=END_YEAR, max_workers=None):
+    """
+    Decode every archive in a process pool (one archive per task) and
+    stack the results into one long table: date, Region, VIF_count.
+    """
+    zip_paths = list(zip_paths)
+    if not zip_paths:
+        return pd.DataFrame(columns=["date", "Region", "VIF_count"])
+
+    jobs = [(path, start_year, end_year) for path in zip_paths]
+    frames = map_archives(_process_archive_job, jobs, max_workers)
+
+    monthly = pd.concat(frames, ignore_index=True)
+    monthly["Region"] = monthly["Region"].astype("category")
+    return (
+        monthly[["date", "Region", "VIF_count"]]
+        .sort_values(["Region", "date"], kind="stable")
+        .reset_index(drop=True)
+    )
+
+
+def find_archives(pattern=ARCHIVE_PATTERN):
+    return sorted(glob.glob(pattern))
+
+
+def read_monthly_vif():
+    """
+    The long monthly VIF table (date, Region, VIF_count): monthly_vif when
+    vif_ingest.py has written it, otherwise the per-region tables stacked
+    into the same layout.
+    """
+    if table_exists(LONG_OUTPUT_TABLE):
+        return read_table(LONG_OUTPUT_TABLE)
+
+    frames = [read_table(name) for name in REGION_TABLES if table_exists(name)]
+    if not frames:
+        raise FileNotFoundError(
+            f"No {LONG_OUTPUT_TABLE} or per-region VIF tables found; run `python vif_ingest.py` first"
+        )
+    monthly = pd.concat(frames, ignore_index=True)
+    monthly["Region"] = monthly["Region"].astype(str).astype("category")
+    return monthly[["date", "Region", "VIF_count"]]
+
+
+# -------------------------------------------------------------------
+# LONG -> WIDE: one column per region on a shared monthly index
+# -------------------------------------------------------------------
+def vif_column(region):
+    """"Ontario" -> "Ontario_VIF", "Newfoundland and Labrador" -> "NL_VIF"."""
+    prefix = REGION_ABBREVIATIONS.get(region, region.replace(" ", "_"))
+    return f"{prefix}_VIF"
+
+
+def align_regions(monthly_vif):
+    """
+    Pivot the long (date, Region, VIF_count) table into one column per
+    region on a gap-free month-start DatetimeIndex, in a single reshape.
+    Regions come from the data, in REGION_ORDER and then by name; months a
+    region lacks (e.g. before its series starts) are NaN.
+    """
+    wide = monthly_vif.pivot_table(
+        index="date", columns="Region", values="VIF_count", aggfunc="sum", observed=True
+    )
+    months = pd.date_range(wide.index.min(), wide.index.max(), freq="MS", name="date")
+    regions = [str(region) for region in wide.columns]
+    order = [region for region in REGION_ORDER if region in regions]
+    wide = wide.reindex(index=months, columns=order + sorted(set(regions) - set(order)))
+    wide.columns = [vif_column(str(region)) for region in wide.columns]
+
+    # keep complete series as integer counts, like the per-region tables
+    complete = [col for col in wide.columns if wide[col].notna().all()]
+    return wide.astype({col: "int64" for col in complete})
+
+
+# -------------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------------
+if __name__ == "__main__":
+    # Optional: pass archive paths explicitly, otherwise ingest every
+    # "Historical Fire Alerts in <Region>.zip" in the working directory.
+    paths = sys.argv[1:] or find_archives()
+    monthly_vif = ingest_archives(paths)
+
+    print(f"Ingested {len(paths)} archives:")
+    print(monthly_vif.groupby("Region", observed=True)["VIF_count"].agg(["count", "sum"]))
+
+    write_table(monthly_vif, LONG_OUTPUT_TABLE)
+    print(f"Saved {LONG_OUTPUT_TABLE}")